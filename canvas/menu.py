@@ -1,5 +1,5 @@
 import pygame
-from scripts.basics.gui import Label, Button, Slider, TextBox
+from scripts.basics.gui import Label, Button, Slider, TextBox, Widget, HitIndex
 
 class Menu():
     '''
@@ -23,7 +23,7 @@ class Menu():
         Creates a new surface for the menu and initializes menu components.
         '''
         # Create a menu surface with the same size as the game screen.
-        self.menu_screen = pygame.Surface((self.screen.WIDTH, self.screen.HEIGHT))
+        self.menu_screen = self.screen.create_canvas()
 
         # Create text and button elements for the menu.
         self.text = Label(self.menu_screen)
@@ -36,20 +36,30 @@ class Menu():
         self.button7 = Button(self.menu_screen, self.screen.aspect_ratio, (500, 450), border_radius=20, shadow_size=(6,6), text_color=(255,255,255), text_hover_color=(255,255,255), button_color=(20,20,20), button_hover_color=(0,0,0), shadow_color=(100,100,100))
         self.button8 = Button(self.menu_screen, self.screen.aspect_ratio, (1200, 30), size=(150, 50), text_font_size=50, border_radius=20, shadow_size=(6,6), border=2)
         self.slider = Slider(self.menu_screen, self.screen.aspect_ratio, (850, 175), slider_value=self.settings.audio_settings['main_volume'])
-        self.text_box = TextBox(self.menu_screen, self.screen.aspect_ratio, (500, 680), size=(500, 50), border=2, transparency=-1, border_radius=20)
+        self.text_box = TextBox(self.menu_screen, self.screen.aspect_ratio, (500, 680), size=(500, 50), border=2, transparency=-1, border_radius=20, clock=self.screen.game_clock)
+        # Clickable areas scaled to the display once, receiving the mouse events.
+        self.hit_index = HitIndex(self.screen)
+        for widget in (self.button1, self.button2, self.button3, self.button4, self.button5, self.button6, self.button7, self.button8, self.slider, self.text_box):
+            self.hit_index.add(widget)
+        # Retained widget tree: only widgets whose state changed are redrawn.
+        self.widgets = self.build_widgets()
+        # Whether the last frame changed nothing, so the next one may wait for events.
+        self.idle = False
 
     def run(self):
         '''
         Main loop to handle menu logic.
         '''
-        # Process events.
+        # Advance game time, which times the widgets.
+        self.screen.game_clock.tick(self.screen.dt)
+        # Process events, waiting for one while the menu is idle.
         self.events()
         # Update logic (if any).
         self.update()
-        # Render menu elements.
-        self.draw()
-        # Handle user interactions.
+        # Handle user interactions, before drawing so hover and press changes show in the same frame.
         self.inputs()
+        # Render the menu elements that changed.
+        self.draw()
     
     def update(self):
         '''
@@ -60,58 +70,99 @@ class Menu():
     def events(self):
         '''
         Handle pygame events, including quitting the game.
+        When nothing changed last frame, sleeps until an event arrives or the text box cursor blinks,
+        instead of polling the widgets in a busy loop.
         '''
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if not events and self.idle:
+            event = pygame.event.wait(self.text_box.next_blink() or 500)
+            events = ([event] if event.type != pygame.NOEVENT else []) + pygame.event.get()
+        for event in events:
             # Quit the game if the window is closed.
             if event.type == pygame.QUIT:
                 self.game.running = False
+            # Mouse events go to the widget under the mouse.
+            self.hit_index.dispatch(event)
             self.text_box.event(event)
-        
-    def draw(self):
-        self.text_box.draw()
-        '''
-        Draw the menu on the screen.
+
+    def build_widgets(self):
         '''
-        # Scale the menu surface to fit the display surface.
-        self.screen.scale_screen(self.menu_screen)
-        # Fill the menu background with white.
-        self.menu_screen.fill((255,255,255))
+        Builds the retained widget tree of the menu: every element with the area it covers,
+        how to draw it and the state that decides when it must be redrawn.
 
-        # Draw buttons with corresponding text.
-        self.button1.draw('1600x900')
-        self.button2.draw('1280x720')
-        self.button3.draw('720x480')
+        Returns:
+        - The root Widget.
+        '''
+        # The root covers the menu, so the first frame paints the whole background.
+        root = Widget(self.menu_screen.get_rect)
+        texts = lambda: self.settings.game_texts
+        video = self.settings.video_settings
+        # Title at the top-center of the screen.
+        title_pos = (int(self.screen.WIDTH/2), 0)
+        root.add(Widget(lambda: self.text.measure(texts()['title'], title_pos, center_w=True), lambda: self.text.write(texts()['title'], title_pos, center_w=True), lambda: texts()['title']))
+        # Resolution, FPS and VSync options.
+        video_group = root.add(Widget())
+        video_group.add(self.button_widget(self.button1, lambda: '1600x900'))
+        video_group.add(self.button_widget(self.button2, lambda: '1280x720'))
+        video_group.add(self.button_widget(self.button3, lambda: '720x480'))
+        video_group.add(self.button_widget(self.button4, lambda: f'{texts()['show_fps']} - {'ON' if video['show_fps'] else 'OFF'}'))
+        video_group.add(Widget(self.fps_area, self.draw_fps, lambda: (video['show_fps'], int(self.screen.clock.get_fps()) if video['show_fps'] else 0)))
+        video_group.add(self.button_widget(self.button7, lambda: f'VSync - {'ON' if video['vsync'] == 1 else 'OFF'}'))
+        # Language buttons.
+        language_group = root.add(Widget())
+        language_group.add(self.button_widget(self.button5, lambda: 'English'))
+        language_group.add(self.button_widget(self.button6, lambda: 'Português'))
+        # Volume slider and its current value.
+        audio_group = root.add(Widget())
+        audio_group.add(Widget(lambda: self.slider.button_rect, self.slider.draw_slider, lambda: (self.slider.pointer_pos, self.slider.current_button_color)))
+        volume = lambda: self.settings.audio_settings['main_volume']
+        audio_group.add(Widget(lambda: self.text.measure(volume(), (850, 100), center_w=True), lambda: self.text.write(volume(), (850, 100), center_w=True), volume))
+        # Text box, with room for its cursor after the text.
+        text_box = self.text_box
+        text_box_area = lambda: text_box.tb_rect.union(pygame.Rect(text_box.tb_x, text_box.tb_y, text_box.text_surf.get_width() + text_box.text_padding + 20, text_box.tb_rect.height))
+        root.add(Widget(text_box_area, text_box.draw, lambda: (text_box.text, text_box.pressed, text_box.cursor_visible())))
+        # Exit button.
+        root.add(self.button_widget(self.button8, lambda: texts()['exit']))
+        return root
 
-        # Display FPS status if enabled.
-        if self.settings.video_settings['show_fps']:
-            status = 'ON'
-            self.text.write('FPS: ', (0, 550))
-            self.text.write(str(int(self.screen.clock.get_fps())), (170, 550))
-        else:
-            status = 'OFF'
-        self.button4.draw(f'{self.settings.game_texts['show_fps']} - {status}')
+    def button_widget(self, button, text):
+        '''
+        Wraps a button in a widget, redrawn when its text, hover colors or press offset change.
 
-        # English language button.
-        self.button5.draw('English')
-        # Portuguese language button.
-        self.button6.draw('Português')
+        Parameters:
+        - button: The Button;
+        - text: Function returning the button text.
 
-        # Display VSync status.
-        if self.settings.video_settings['vsync'] == 1:
-            status = 'ON'
-        else:
-            status = 'OFF'
-        self.button7.draw(f'VSync - {status}')
+        Returns:
+        - The Widget.
+        '''
+        # The button moves onto its shadow while pressed.
+        area = button.button_rect.union(button.shadow_rect).union(button.button_rect.move(button.shadow_size))
+        return Widget(lambda: area, lambda: button.draw(text()), lambda: (text(), button.current_button_color, button.text_color, button.button_rect.center))
 
-        # Draw the title text at the top-center of the screen.
-        self.text.write(self.settings.game_texts['title'], (int(self.screen.WIDTH/2), 0), center_w=True)
+    def fps_area(self):
+        '''
+        Returns the area covered by the FPS counter.
+        '''
+        if not self.settings.video_settings['show_fps']:
+            return pygame.Rect(0, 550, 0, 0)
+        return self.text.measure('FPS: ', (0, 550)).union(self.text.measure(str(int(self.screen.clock.get_fps())), (170, 550)))
 
-        # Exit button.
-        self.button8.draw(self.settings.game_texts['exit'])
-        # Draw volume slider.
-        self.slider.draw_slider()
-        # Display current volume.
-        self.text.write(self.settings.audio_settings['main_volume'], (850, 100), center_w=True)
+    def draw_fps(self):
+        '''
+        Draws the FPS counter, if enabled.
+        '''
+        if self.settings.video_settings['show_fps']:
+            self.text.write('FPS: ', (0, 550))
+            self.text.write(str(int(self.screen.clock.get_fps())), (170, 550))
+        
+    def draw(self):
+        '''
+        Draws the widgets that changed and presents only their areas; an idle menu draws nothing.
+        '''
+        rects = self.widgets.render(self.menu_screen, (255,255,255))
+        self.idle = not rects
+        self.screen.present(self.menu_screen, rects)
 
     def inputs(self):
         '''
@@ -142,6 +193,7 @@ class Menu():
         if self.button7.click():
             self.settings.set_settings('video', 'vsync', 0) if self.settings.video_settings['vsync'] == 1 else self.settings.set_settings('video', 'vsync', 1)
             self.screen.resize_screen(self.settings.video_settings['width'], self.settings.video_settings['height'], self.settings.video_settings['vsync'])
+            self.new_screen()
         
         # Handle exit button.
         if self.button8.click():
@@ -150,6 +202,4 @@ class Menu():
         # Handle slider interaction.
         if self.slider.click_slider():
             self.settings.set_settings('audio', 'main_volume', self.slider.slider_value)
-        
-        # Handle text_box interaction.
-        self.text_box.click()
+
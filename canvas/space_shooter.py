@@ -1,9 +1,15 @@
 import pygame
 from scripts.basics.assets import Assets
-from scripts.objects.stars import Stars
+from scripts.objects.stars import Starfield
 from scripts.objects.ship import Ship
-from scripts.objects.meteor import Meteor
+from scripts.objects.meteor_field import MeteorField
+from scripts.objects.particles import ParticleSystem
 from scripts.basics.gui import Label
+from scripts.basics.collision import Collision
+from scripts.basics.culling import Culling
+from scripts.basics.timestep import FixedTimestep
+from scripts.basics.scheduler import Scheduler
+from scripts.basics.renderer import Renderer
 
 class SpaceShooter():
     '''
@@ -19,45 +25,270 @@ class SpaceShooter():
         self.settings = game.settings
         # Access the game's screen.
         self.screen = game.screen
-        self.assets = Assets(self.settings.path)
-        # Setup a new menu screen.
-        self.new_screen()
+        # Action states sampled from the keyboard and gamepads.
+        self.input = game.input
+        # Assets load on worker threads; the game starts once the essential ones are ready.
+        self.assets = Assets(self.settings.path, game.audio, self.settings.performance_settings['rotation_steps'])
+        if game.headless:
+            # Headless runs must not depend on loading speed, so they wait for every asset.
+            self.assets.wait()
+        self.started = False
+        # Broadphase collision detection over the logical screen space.
+        self.collision = Collision(self.screen.WIDTH, self.screen.HEIGHT)
+        # Removes whatever left the logical view or lived too long, so entity counts stay bounded.
+        self.culling = Culling(self.screen.WIDTH, self.screen.HEIGHT, self.settings.culling_settings)
+        # Fixed-step simulation, decoupled from the display frame rate.
+        self.timestep = FixedTimestep(self.settings.performance_settings['tick_rate'], self.settings.performance_settings['max_catch_up'])
+        # The canvases are created now, and again whenever the display is recreated.
+        self.create_canvases()
+        self.screen.on_resize(self.create_canvases)
+        self.load()
     
+    def load(self):
+        '''
+        Finishes the assets that completed loading, starting the game as soon as the essential ones are ready.
+        The sounds that are still loading play once they arrive.
+
+        Returns:
+        - Whether the game is started.
+        '''
+        self.assets.poll()
+        if not self.started:
+            if not self.assets.essentials_ready():
+                return False
+            self.started = True
+            # Setup a new menu screen.
+            self.new_screen()
+        return True
+
     def new_screen(self):
         '''
         Creates a new surface for the menu and initializes menu components.
         '''
-        # Create a menu surface with the same size as the game screen.
-        self.assets.groups()
-        self.canvas_surf = pygame.Surface((self.screen.WIDTH, self.screen.HEIGHT))
-        for _ in range (20):
-            Stars(self, self.assets.star_surf, self.assets.all_sprites) 
+        # Only redraw and present the areas that changed, when enabled.
+        self.dirty_rendering = self.settings.video_settings['dirty_rendering']
+        self.assets.groups(self.settings.performance_settings['pool_sizes'])
+        # Sprites, meteors and particles are queued every frame and drawn in one batch per layer.
+        self.renderer = Renderer(self.game.profiler)
+        # Game canvas and score label.
+        self.create_canvases()
+        # Star background composited once, also restored behind moving sprites by the dirty-rectangle renderer.
+        video = self.settings.video_settings
+        self.starfield = Starfield(self.assets.star_surf, (self.screen.WIDTH, self.screen.HEIGHT), (58,46,63), video['star_count'], video['star_layers'], video['star_scroll_speed'])
+        # Visual effects, kept in arrays under a hard budget instead of one sprite per explosion.
+        self.particles = ParticleSystem(self, self.assets.explosion_surf, self.settings.performance_settings['particle_budget'])
         self.ship = Ship(self, self.assets.ship_surf, self.assets.all_sprites)
-        self.meteor_event = pygame.event.custom_type()
+        # In meteor storm mode, meteors live in a vectorized field instead of individual sprites.
+        self.meteor_field = MeteorField(self, self.assets.meteor_frames, self.game.storm_meteors) if self.game.storm_meteors else None
+        # Meteors spawn from a queue of events on simulation time, so fixed-dt runs spawn the same way every time.
+        self.scheduler = Scheduler()
+        self.schedule_spawning()
+        self.game.audio.play_music(self.assets.music_path)
+
+    def create_canvases(self):
+        '''
+        Creates the surfaces the game draws on, and the labels bound to them.
+        In native mode a canvas is the display surface itself, so they must be created again whenever the display is.
+        '''
+        # Loading screen, shown until the essential assets are ready.
+        self.loading_surf = self.screen.create_canvas()
+        self.loading_text = Label(self.loading_surf, (255, 255, 255), font=self.assets.font_text, font_size=60)
+        if not self.started:
+            return
+        # Create a game surface with the same size as the game screen.
+        self.canvas_surf = self.screen.create_canvas()
         self.score_text = Label(self.canvas_surf, (255, 255, 255), font=self.assets.font_text, border_color=(255,255,255), border_radius=10, font_size=80, border_padding=15, border_width=5)
-        pygame.time.set_timer(self.meteor_event, 500)
-        self.assets.game_music.play(loops=-1)
+        # Areas drawn last frame (sprites, particles, score label, overlay), and whether the whole canvas must be presented.
+        self.previous_rects = []
+        self.full_redraw = True
 
     def run(self):
         '''
         Main loop to handle menu logic.
         '''
+        profiler = self.game.profiler
+        with profiler.section('load'):
+            started = self.load()
+        if not started:
+            self.events()
+            self.draw_loading()
+            return
         # Process events.
-        self.events()
-        # Update logic (if any).
-        self.update()
+        with profiler.section('events'):
+            self.events()
+            self.read_input()
+        # Update logic, in fixed simulation steps.
+        with profiler.section('update'):
+            self.simulate()
         # Render menu elements.
-        self.draw()
+        with profiler.section('draw'):
+            self.draw()
         # Handle user interactions.
         self.inputs()
     
-    def update(self):
+    def read_input(self):
+        '''
+        Samples the input for this frame, or takes the input and delta time from the replay being played,
+        and records them when a recording is running.
+        '''
+        replay = self.game.replay
+        if replay:
+            self.screen.dt, held = replay.next_frame()
+            self.input.update(held)
+        else:
+            self.input.sample()
+        if self.game.recorder:
+            self.game.recorder.record(self.screen.dt, self.input.held)
+        # Pausing is handled at once, since no simulation step runs to consume the press while paused.
+        if self.input.take('pause'):
+            self.screen.game_clock.paused = not self.screen.game_clock.paused
+        if self.screen.game_clock.paused:
+            # Presses made while paused are dropped, so they do not fire on unpause.
+            self.input.consume()
+
+    def simulate(self):
+        '''
+        Runs as many fixed simulation steps as the frame time allows.
+        Sprite positions are saved before the last step, so drawing can interpolate between the last two states.
+        The game clock advances with each step, so timers read the simulated time, and time dropped after a hitch is never counted.
+        '''
+        game_clock = self.screen.game_clock
+        steps = self.timestep.advance(game_clock.scale_frame(self.screen.dt), game_clock.scale)
+        for step in range(steps):
+            if step == steps - 1:
+                for sprite in self.assets.all_sprites:
+                    sprite.previous_center = sprite.rect.center
+            game_clock.advance(self.timestep.step)
+            self.update(self.timestep.step)
+
+    def update(self, delta_time):
+        '''
+        Advances the game by one simulation step.
+
+        Parameters:
+        - delta_time: Duration of the step, in seconds.
         '''
-        Update menu components (currently unused).
+        self.scheduler.advance(delta_time)
+        if self.meteor_field:
+            # Refill the storm, scattering new meteors over a screen height above the top edge.
+            self.meteor_field.spawn(self.meteor_field.capacity - self.meteor_field.count, self.screen.HEIGHT)
+        self.starfield.update(delta_time)
+        with self.game.profiler.section('sprite_update'):
+            self.assets.all_sprites.update(delta_time)
+            if self.meteor_field:
+                self.meteor_field.update(delta_time)
+            self.particles.update(delta_time)
+        with self.game.profiler.section('culling'):
+            self.cull()
+        with self.game.profiler.section('collision'):
+            self.collisions()
+        # Presses were seen by this step.
+        self.input.consume()
+
+    def cull(self):
+        '''
+        Runs the culling pass over the meteors, lasers and particles.
+        '''
+        time = self.screen.game_clock.time
+        self.culling.cull_sprites(self.assets.meteor_sprites, time)
+        self.culling.cull_sprites(self.assets.laser_sprites, time)
+        if self.meteor_field:
+            self.culling.cull_field(self.meteor_field, time)
+        self.culling.cull_particles(self.particles)
+
+    def schedule_spawning(self):
+        '''
+        Queues the meteor spawns described by the 'spawning' settings: a steady stream whose interval
+        shrinks as the game goes on, and scripted waves of meteor bursts.
+        The steady stream is off in meteor storm mode, where the field refills itself.
+        '''
+        spawning = self.settings.spawn_settings
+        if not self.meteor_field:
+            self.scheduler.schedule(self.spawn_interval(0), self.spawn_tick)
+        for wave in spawning['waves']:
+            for burst in range(wave['bursts']):
+                self.scheduler.schedule_at(wave['at'] + burst * wave['every'], self.spawn_meteors, wave['count'])
+
+    def spawn_interval(self, time):
+        '''
+        Difficulty curve: the delay between two meteors of the steady stream at a point of the game.
+
+        Parameters:
+        - time: Simulation time in seconds.
+
+        Returns:
+        - The interval divided by 1 + ramp * minutes played, never below min_interval.
+        '''
+        spawning = self.settings.spawn_settings
+        return max(spawning['interval'] / (1 + spawning['ramp'] * time / 60), spawning['min_interval'])
+
+    def spawn_tick(self):
+        '''
+        Spawns the next meteor of the steady stream and schedules the following one.
+        '''
+        self.spawn_meteors(1)
+        self.scheduler.schedule(self.spawn_interval(self.scheduler.current), self.spawn_tick)
+
+    def spawn_meteors(self, count):
         '''
-        self.assets.all_sprites.update(self.screen.dt)
-        if pygame.sprite.spritecollide(self.ship, self.assets.meteor_sprites, True, pygame.sprite.collide_mask):
-            self.assets.damage_sound.play()
+        Spawns meteors in a single step.
+
+        Parameters:
+        - count: Number of meteors.
+        '''
+        if self.meteor_field:
+            self.meteor_field.spawn(count)
+            return
+        for _ in range(count):
+            self.assets.pools['meteor'].acquire(self, self.assets.meteor_frames)
+
+    def collisions(self):
+        '''
+        Runs collision detection once per frame and resolves every contact in a fixed order.
+        '''
+        if self.meteor_field:
+            self.field_collisions()
+            return
+        self.collision.build(self.assets.meteor_sprites)
+        # Lasers destroy every meteor they touch.
+        for laser, meteor in self.collision.contacts(self.assets.laser_sprites):
+            if meteor.alive():
+                laser.kill()
+                meteor.kill()
+                self.explode(laser.rect.midtop)
+                self.ship.meteors_destroyed += 1
+        # Meteors that reach the ship are destroyed and damage it.
+        ship_contacts = [meteor for ship, meteor in self.collision.contacts([self.ship]) if meteor.alive()]
+        for meteor in ship_contacts:
+            meteor.kill()
+        if ship_contacts:
+            self.assets.play('damage_sound')
+
+    def explode(self, position):
+        '''
+        Emits an explosion with its sparks and debris, and plays its sound.
+
+        Parameters:
+        - position: Center of the explosion.
+        '''
+        self.particles.explode(position)
+        self.assets.play('explosion_sound')
+
+    def field_collisions(self):
+        '''
+        Resolves laser and ship contacts against the meteor field, in laser order.
+        '''
+        for laser in list(self.assets.laser_sprites):
+            hits = self.meteor_field.collide(laser)
+            if hits:
+                self.meteor_field.remove(hits)
+                laser.kill()
+                self.explode(laser.rect.midtop)
+                self.ship.meteors_destroyed += len(hits)
+        hits = self.meteor_field.collide(self.ship)
+        if hits:
+            self.meteor_field.remove(hits)
+            self.assets.play('damage_sound')
 
     def events(self):
         '''
@@ -67,19 +298,119 @@ class SpaceShooter():
             # Quit the game if the window is closed.
             if event.type == pygame.QUIT:
                 self.game.running = False
-            if event.type == self.meteor_event:
-                Meteor(self, self.assets.meteor_surf, (self.assets.all_sprites, self.assets.meteor_sprites))
+            # Track gamepads being connected and removed.
+            self.input.event(event)
         
     def draw(self):
         '''
         Draw the menu on the screen.
         '''
+        if self.dirty_rendering:
+            self.draw_dirty()
+            return
+        profiler = self.game.profiler
         # Scale the menu surface to fit the display surface.
-        self.screen.scale_screen(self.canvas_surf)
-        # Fill the menu background with white.
-        self.canvas_surf.fill((58,46,63))
-        self.assets.all_sprites.draw(self.canvas_surf)
+        with profiler.section('scale_screen'):
+            self.screen.scale_screen(self.canvas_surf)
+        # Draw the star background.
+        self.starfield.draw(self.canvas_surf)
+        with profiler.section('sprite_draw'):
+            moved = self.interpolate()
+            self.renderer.submit_sprites(self.assets.all_sprites)
+            if self.meteor_field:
+                self.meteor_field.draw(self.renderer, self.interpolation_time())
+            self.particles.draw(self.renderer, self.interpolation_time())
+            self.renderer.flush(self.canvas_surf)
+            self.restore(moved)
         self.score_text.write(self.ship.meteors_destroyed, (self.game.screen.WIDTH/2, self.game.screen.HEIGHT-100), True)
+        # Frame timing overlay, when enabled.
+        profiler.draw(self.canvas_surf)
+
+    def draw_loading(self):
+        '''
+        Draws the loading screen with a progress bar.
+        '''
+        self.loading_surf.fill((58,46,63))
+        center = (self.screen.WIDTH / 2, self.screen.HEIGHT / 2)
+        self.loading_text.write('Loading', (center[0], center[1] - 60), True)
+        bar = pygame.FRect(0, 0, self.screen.WIDTH / 2, 30)
+        bar.center = center
+        pygame.draw.rect(self.loading_surf, (255,255,255), bar, 3, 10)
+        fill = bar.inflate(-12, -12)
+        fill.width *= self.assets.progress()
+        pygame.draw.rect(self.loading_surf, (255,255,255), fill, 0, 6)
+        self.screen.scale_screen(self.loading_surf)
+
+    def draw_dirty(self):
+        '''
+        Draws the game redrawing only the areas that changed, and presents only those areas.
+        '''
+        profiler = self.game.profiler
+        # Scrolling star layers change the whole background, and a meteor storm covers it, so everything is redrawn.
+        full_redraw = self.full_redraw or self.starfield.scrolling or self.meteor_field is not None
+        if full_redraw:
+            self.starfield.draw(self.canvas_surf)
+        else:
+            # Restore the background behind everything drawn last frame.
+            for rect in self.previous_rects:
+                self.canvas_surf.blit(self.starfield.background, rect, rect)
+        with profiler.section('sprite_draw'):
+            moved = self.interpolate()
+            self.renderer.submit_sprites(self.assets.all_sprites)
+            drawn_rects = [pygame.Rect(sprite.rect) for sprite in self.assets.all_sprites]
+            if self.meteor_field:
+                self.meteor_field.draw(self.renderer, self.interpolation_time())
+            particles_rect = self.particles.draw(self.renderer, self.interpolation_time())
+            self.renderer.flush(self.canvas_surf)
+            self.restore(moved)
+        if particles_rect:
+            drawn_rects.append(particles_rect)
+        drawn_rects.append(self.score_text.write(self.ship.meteors_destroyed, (self.game.screen.WIDTH/2, self.game.screen.HEIGHT-100), True))
+        overlay_rect = profiler.draw(self.canvas_surf)
+        if overlay_rect:
+            drawn_rects.append(overlay_rect)
+        rects = self.previous_rects + drawn_rects
+        self.previous_rects = drawn_rects
+        if full_redraw:
+            rects = [self.canvas_surf.get_rect()]
+            self.full_redraw = False
+        with profiler.section('scale_screen'):
+            self.screen.present(self.canvas_surf, rects)
+
+    def interpolate(self):
+        '''
+        Moves every sprite to its interpolated position between the last two simulation states, for drawing.
+
+        Returns:
+        - A list of (sprite, simulated center) pairs to restore after drawing.
+        '''
+        alpha = self.timestep.alpha
+        moved = []
+        if alpha >= 1:
+            return moved
+        for sprite in self.assets.all_sprites:
+            previous = sprite.previous_center
+            if previous is not None:
+                center = sprite.rect.center
+                sprite.rect.center = (previous[0] + (center[0] - previous[0]) * alpha, previous[1] + (center[1] - previous[1]) * alpha)
+                moved.append((sprite, center))
+        return moved
+
+    def restore(self, moved):
+        '''
+        Moves sprites back to their simulated positions after drawing.
+
+        Parameters:
+        - moved: The list returned by interpolate().
+        '''
+        for sprite, center in moved:
+            sprite.rect.center = center
+
+    def interpolation_time(self):
+        '''
+        Returns how far, in seconds, the displayed state lags behind the last simulated state.
+        '''
+        return (self.timestep.alpha - 1) * self.timestep.step
 
     def inputs(self):
         '''
@@ -1,42 +1,158 @@
+import argparse
+import math
+import os
+import random
+import time
 import pygame
 from scripts.basics.screen import Screen
 from scripts.basics.settings import Settings
+from scripts.basics.profiler import Profiler
+from scripts.basics.input import Input
+from scripts.basics.audio import Audio
+from scripts.basics.replay import Recorder, Replay
 from canvas.space_shooter import SpaceShooter
 
 class Main():
     '''
     Manages the main loop and game states for the application.
     '''
-    def __init__(self):
+    def __init__(self, headless=False, frames=0, dt=None, seed=None, profile=False, trace_path=None, storm_meteors=None, record_path=None, replay_path=None, time_scale=1):
         '''
         Initializes the game by setting up required components like settings, screen, and menu.
+
+        Parameters:
+        - headless: Runs without a window or audio device, using SDL's dummy drivers;
+        - frames: Number of frames to simulate before exiting (0 runs until the window is closed);
+        - dt: Fixed delta time in seconds for every frame, or None to use the wall clock;
+        - seed: Seed for the random number generator, or None for a random game;
+        - profile: Draws the frame timing overlay, regardless of the 'show_profiler' setting;
+        - trace_path: Path of a CSV file receiving the per-frame timings of the session, or None;
+        - storm_meteors: Number of meteors kept alive in meteor storm mode (0 disables it), or None to use the 'storm_meteors' setting;
+        - record_path: Path of a replay file receiving the inputs and delta times of the session, or None;
+        - replay_path: Path of a replay file to play back instead of reading the input devices, or None;
+        - time_scale: Game speed factor (e.g. 10 plays ten times faster than real time).
+        The replay's seed, meteor storm size and time scale replace the seed, storm_meteors and time_scale arguments.
         '''
+        self.headless = headless
+        self.frames = frames
+        if headless:
+            # SDL reads the drivers when it initializes, so they must be set before pygame.init().
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        # Recorded session played back, frame by frame.
+        self.replay = Replay(replay_path) if replay_path else None
+        if self.replay:
+            seed = self.replay.seed
+            storm_meteors = self.replay.storm_meteors
+            time_scale = self.replay.time_scale
+        elif record_path and seed is None:
+            # A recording needs a known seed to be reproduced.
+            seed = random.randrange(2 ** 32)
+        if seed is not None:
+            random.seed(seed)
         # Initialize Pygame.
         pygame.init()
         # Create an instance of the Settings class to manage configuration.
         self.settings = Settings()
+        # Sound channels and music, at the main volume.
+        self.audio = Audio(self.settings)
+        # Keyboard and gamepad bindings, compiled from the settings.
+        self.input = Input(self.settings)
+        if self.replay:
+            self.replay.remap(self.input.actions)
+        # Per-phase frame timings, always measured in headless mode so they can be reported.
+        self.profiler = Profiler(headless, profile or self.settings.video_settings['show_profiler'], trace_path)
+        # Meteor storm mode size, where meteors are simulated as a vectorized field.
+        self.storm_meteors = self.settings.performance_settings['storm_meteors'] if storm_meteors is None else storm_meteors
         # Create an instance of the Screen class, passing the settings to configure the display.
         self.screen = Screen(self.settings)
+        # Simulate every frame with the same delta time instead of the measured one.
+        self.screen.fixed_dt = dt
+        self.screen.game_clock.scale = time_scale
+        # Session recording, written at exit.
+        self.recorder = Recorder(record_path, seed, self.storm_meteors, time_scale, self.input.actions) if record_path else None
         # A flag to control the main game loop.
         self.running = True
         # Set the initial game state to 'menu'.
         self.game_state = 'space_shooter'
         self.space_shooter = SpaceShooter(self)
+        # Frame counter and peak sprite counts, reported at exit in headless mode.
+        self.frame = 0
+        self.peak_sprites = {'all': 0, 'meteors': 0, 'lasers': 0, 'particles': 0}
     
     def run(self):
         '''
         Runs the main game loop. 
         Continuously updates the game state and renders the screen until the game is exited.
         '''
-        while self.running:
-            # Calculate the time elapsed since the last frame (delta time) for consistent animations and logic.
-            self.screen.delta_time()
-            # Handle user inputs and manage transitions between game states.
-            self.controller()
-            # Refresh the screen to reflect changes.
-            self.screen.screen_update()
-        # Exit the game and clean up resources.
-        pygame.quit()
+        start_time = time.perf_counter()
+        try:
+            while self.running:
+                # Calculate the time elapsed since the last frame (delta time) for consistent animations and logic.
+                with self.profiler.section('delta_time'):
+                    self.screen.delta_time()
+                # Handle user inputs and manage transitions between game states.
+                with self.profiler.section('controller'):
+                    self.controller()
+                # Refresh the screen to reflect changes.
+                with self.profiler.section('display_update'):
+                    self.screen.screen_update()
+                self.profiler.frame()
+                self.statistics()
+            if self.headless:
+                self.report(time.perf_counter() - start_time)
+        finally:
+            # Write any pending settings change, the timing trace and the session recording, even when the loop
+            # stopped on an error; each write runs even if an earlier one fails.
+            try:
+                self.settings.flush()
+            finally:
+                try:
+                    self.profiler.close()
+                finally:
+                    try:
+                        if self.recorder:
+                            self.recorder.close()
+                    finally:
+                        # Exit the game and clean up resources.
+                        pygame.quit()
+
+    def statistics(self):
+        '''
+        Counts simulated frames, tracks peak sprite counts and stops once the requested number of frames is reached.
+        '''
+        self.frame += 1
+        if self.frames and self.frame >= self.frames or self.replay and self.replay.finished():
+            self.running = False
+        if not self.space_shooter.started:
+            return
+        assets = self.space_shooter.assets
+        self.peak_sprites['all'] = max(self.peak_sprites['all'], len(assets.all_sprites))
+        meteors = len(assets.meteor_sprites) + (self.space_shooter.meteor_field.count if self.space_shooter.meteor_field else 0)
+        self.peak_sprites['meteors'] = max(self.peak_sprites['meteors'], meteors)
+        self.peak_sprites['lasers'] = max(self.peak_sprites['lasers'], len(assets.laser_sprites))
+        self.peak_sprites['particles'] = max(self.peak_sprites['particles'], self.space_shooter.particles.count)
+
+    def report(self, elapsed):
+        '''
+        Prints the simulation throughput and peak sprite counts.
+
+        Parameters:
+        - elapsed: Wall-clock time spent in the main loop, in seconds.
+        '''
+        print(f'Simulated {self.frame} frames in {elapsed:.3f}s ({self.frame / max(elapsed, 1e-9):.1f} frames/s)')
+        print('Peak sprites: ' + ', '.join(f'{name}={count}' for name, count in self.peak_sprites.items()))
+        for name, pool in self.space_shooter.assets.pools.items():
+            print(f'Pool {name}: ' + ', '.join(f'{counter}={value}' for counter, value in pool.stats().items()))
+        if self.space_shooter.started:
+            print(f'Particles dropped over budget: {self.space_shooter.particles.dropped}')
+            print('Culled: ' + ', '.join(f'{reason}={count}' for reason, count in self.space_shooter.culling.culled.items()))
+        for name in self.profiler.samples:
+            p50, p95, p99 = self.profiler.percentiles(name)
+            print(f'{name}: p50={p50:.3f}ms p95={p95:.3f}ms p99={p99:.3f}ms')
+        for name in self.profiler.counters:
+            p50, p95, p99 = self.profiler.percentiles(name)
+            print(f'{name}: p50={p50} p95={p95} p99={p99}')
 
     def controller(self):
         '''
@@ -46,6 +162,38 @@ class Main():
         if self.game_state == 'space_shooter':
             self.space_shooter.run()
 
+def parse_args():
+    '''
+    Parses the command line options.
+
+    Returns:
+    - The parsed arguments namespace.
+    '''
+    parser = argparse.ArgumentParser(description='Space Shooter')
+    parser.add_argument('--headless', action='store_true', help='run a deterministic simulation without a window or audio')
+    parser.add_argument('--frames', type=int, default=None, help='number of frames to simulate (default: 3600 when headless, unlimited otherwise)')
+    parser.add_argument('--dt', type=float, default=None, help='fixed delta time per frame in seconds (default: 1/60 when headless)')
+    parser.add_argument('--seed', type=int, default=None, help='random seed (default: 0 when headless)')
+    parser.add_argument('--storm', type=int, default=None, metavar='METEORS', help='meteor storm mode with this many meteors (default: the storm_meteors setting)')
+    parser.add_argument('--profile', action='store_true', help='draw the frame timing overlay')
+    parser.add_argument('--trace', default=None, help='write per-frame phase timings to this CSV file')
+    parser.add_argument('--time-scale', type=float, default=1, metavar='SCALE', help='game speed factor, e.g. 10 for soak tests (default: 1)')
+    parser.add_argument('--record', default=None, metavar='PATH', help='record the inputs and delta times of the session to this replay file')
+    parser.add_argument('--replay', default=None, metavar='PATH', help='play back a replay file (with --headless, as fast as possible)')
+    args = parser.parse_args()
+    if not math.isfinite(args.time_scale) or args.time_scale <= 0:
+        # A zero or negative scale would stop or reverse the simulation; pausing has its own key.
+        parser.error('--time-scale must be a positive number')
+    if args.record and args.seed is not None and not 0 <= args.seed < 2 ** 64:
+        parser.error(f'--seed must be between 0 and {2 ** 64 - 1} when recording')
+    if args.headless:
+        # Replays run to their end unless a frame count is given.
+        args.frames = (0 if args.replay else 3600) if args.frames is None else args.frames
+        args.dt = 1 / 60 if args.dt is None else args.dt
+        args.seed = 0 if args.seed is None else args.seed
+    return args
+
 # Ensure the script runs only if executed directly, not when imported.
 if __name__ == '__main__':
-    Main().run()
+    args = parse_args()
+    Main(args.headless, args.frames or 0, args.dt, args.seed, args.profile, args.trace, args.storm, args.record, args.replay, args.time_scale).run()
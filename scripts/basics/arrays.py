@@ -0,0 +1,66 @@
+import random
+import numpy as np
+
+class ArraySystem():
+    '''
+    Base of the structure-of-arrays systems (meteor field, particles): every entity is a row of parallel
+    NumPy arrays, and live entities fill the first count rows. Subclasses allocate their arrays with array().
+    '''
+    def __init__(self, capacity):
+        '''
+        Initializes the ArraySystem class.
+
+        Parameters:
+        - capacity: Maximum number of entities alive at once.
+
+        Attributes:
+        - count: Number of live entities;
+        - arrays: The per-entity arrays, compacted together by keep();
+        - rng: NumPy generator for bulk random values.
+        '''
+        self.capacity = capacity
+        self.count = 0
+        self.arrays = []
+        # Seeded from the random module, so seeded runs stay reproducible.
+        self.rng = np.random.default_rng(random.getrandbits(32))
+
+    def array(self, shape=(), dtype=np.float32, fill=0):
+        '''
+        Allocates a per-entity array.
+
+        Parameters:
+        - shape: Shape of each entity's value, e.g. (2,) for a position;
+        - dtype: The NumPy type of the values;
+        - fill: Initial value.
+
+        Returns:
+        - An array of shape (capacity, *shape).
+        '''
+        array = np.full((self.capacity, *shape), fill, dtype=dtype)
+        self.arrays.append(array)
+        return array
+
+    def keep(self, selection):
+        '''
+        Compacts the arrays, keeping only the selected live entities in their current order.
+
+        Parameters:
+        - selection: Boolean array over the live entities.
+        '''
+        indices = np.flatnonzero(selection)
+        if len(indices) == self.count:
+            return
+        for array in self.arrays:
+            array[:len(indices)] = array[indices]
+        self.count = len(indices)
+
+    def remove(self, indices):
+        '''
+        Removes entities by index.
+
+        Parameters:
+        - indices: Indices of the live entities to remove.
+        '''
+        selection = np.ones(self.count, dtype=bool)
+        selection[indices] = False
+        self.keep(selection)
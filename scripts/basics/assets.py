@@ -1,40 +1,185 @@
 import pygame
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from scripts.basics.atlas import Atlas
+from scripts.basics.pool import Pool
+from scripts.objects.ship import Laser
+from scripts.objects.meteor import Meteor
 
 class Assets:
-    def __init__(self, path):
+    # Images needed before the game can start; everything else streams in while playing.
+    ESSENTIAL = ('images',)
+
+    def __init__(self, path, audio, rotation_steps=64, workers=4):
         '''
-        Initializes the Sprites class, setting up the directory for loading images.
+        Initializes the Sprites class, setting up the directory for loading images,
+        and starts decoding every image and sound on a pool of worker threads.
 
         Parameters:
-        - path: The base directory path where the 'images' folder is located.
+        - path: The base directory path where the 'images' folder and the 'cache' folder are located;
+        - audio: The audio manager playing the sounds;
+        - rotation_steps: Number of pre-rotated frames built for each rotating sprite;
+        - workers: Number of loader threads.
+
+        Surfaces and sounds are None until poll() has finished them on the main thread.
         '''
         # Set the path to the 'images' directory by joining the base path with 'images'.
         self.images_dir = os.path.join(path, 'assets/images')
         self.audio_dir = os.path.join(path, 'assets/audio')
-        self.ship_surf = pygame.image.load(os.path.join(self.images_dir, 'player.png')).convert_alpha()
-        self.star_surf = pygame.image.load(os.path.join(self.images_dir, 'star.png')).convert_alpha()
-        self.meteor_surf = pygame.image.load(os.path.join(self.images_dir, 'meteor.png')).convert_alpha()
-        self.laser_surf = pygame.image.load(os.path.join(self.images_dir, 'laser.png')).convert_alpha()
+        self.audio = audio
+        # The music is streamed from disk while playing, never loaded.
+        self.music_path = os.path.join(self.audio_dir, 'game_music.wav')
+        self.rotation_steps = rotation_steps
         self.font_text = os.path.join(self.images_dir, 'Oxanium-Bold.ttf')
-        self.explosion_surf = self.animated_sprites(pygame.image.load(os.path.join(self.images_dir, 'explosion.png')).convert_alpha(), 21, (5,5), (50,50))
+        self.ship_surf = None
+        self.star_surf = None
+        self.meteor_surf = None
+        self.meteor_frames = None
+        self.laser_surf = None
+        self.explosion_surf = None
+        self.laser_sound = None
+        self.explosion_sound = None
+        self.damage_sound = None
+        # Collision masks for every sprite frame, built once so collision tests never allocate masks.
+        self.masks = {}
+        # Every sprite frame, including the meteor rotations and explosion frames, packed in one baked image.
+        self.atlas = Atlas(self.images_dir, os.path.join(path, 'cache', 'atlas.bin'), rotation_steps)
+        # Decoding runs on worker threads; convert_alpha() and everything that needs it stay on the main thread.
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='assets')
+        self.tasks = {
+            'images': self.executor.submit(self.atlas.load),
+            'laser_sound': self.executor.submit(self.load_sound, 'laser.wav'),
+            'explosion_sound': self.executor.submit(self.load_sound, 'explosion.wav'),
+            'damage_sound': self.executor.submit(self.load_sound, 'damage.ogg'),
+        }
+        self.loaded = set()
+
+    def load_sound(self, name):
+        '''
+        Decodes a sound file (runs on a worker thread).
+
+        Parameters:
+        - name: The file name inside the audio directory.
+        '''
+        return pygame.mixer.Sound(os.path.join(self.audio_dir, name))
+
+    def poll(self):
+        '''
+        Finishes the assets whose loading completed, on the main thread. Called once per frame.
+
+        Returns:
+        - The names of the assets that became available.
+        '''
+        finished = []
+        for name, task in self.tasks.items():
+            if name not in self.loaded and task.done():
+                self.finish(name, task.result())
+                self.loaded.add(name)
+                finished.append(name)
+        if finished and self.ready():
+            self.executor.shutdown(wait=False)
+        return finished
+
+    def finish(self, name, result):
+        '''
+        Converts a decoded asset for fast blitting and builds what derives from it.
+
+        Parameters:
+        - name: The asset name;
+        - result: What the loader returned.
+        '''
+        if name == 'images':
+            frames = self.atlas.frames()
+            self.ship_surf = frames['ship'][0]
+            self.laser_surf = frames['laser'][0]
+            self.meteor_surf = frames['meteor'][0]
+            self.star_surf = frames['star'][0]
+            # Pre-rotated meteor frames, shared by every meteor instead of rotating each frame.
+            self.meteor_frames = self.rotation_frames(frames['meteor_rotations'])
+            self.explosion_surf = frames['explosion']
+            self.build_masks([self.ship_surf, self.laser_surf, *self.meteor_frames])
+        else:
+            setattr(self, name, result)
+
+    def progress(self):
+        '''
+        Returns the fraction of assets available, from 0 to 1.
+        '''
+        return len(self.loaded) / len(self.tasks)
+
+    def essentials_ready(self):
+        '''
+        Whether every asset needed to start playing is available.
+        '''
+        return all(name in self.loaded for name in self.ESSENTIAL)
 
-        self.laser_sound = pygame.mixer.Sound(os.path.join(self.audio_dir, 'laser.wav'))
-        self.explosion_sound = pygame.mixer.Sound(os.path.join(self.audio_dir, 'explosion.wav'))
-        self.damage_sound = pygame.mixer.Sound(os.path.join(self.audio_dir, 'damage.ogg'))
-        self.game_music = pygame.mixer.Sound(os.path.join(self.audio_dir, 'game_music.wav'))
+    def ready(self):
+        '''
+        Whether every asset is available.
+        '''
+        return len(self.loaded) == len(self.tasks)
+
+    def wait(self):
+        '''
+        Blocks until every asset is loaded and finished, for runs that must not depend on loading speed.
+        '''
+        while not self.ready():
+            wait(self.tasks.values())
+            self.poll()
+
+    def play(self, name):
+        '''
+        Plays a sound through the audio manager if it finished loading, and does nothing otherwise.
+
+        Parameters:
+        - name: The sound attribute name (e.g. 'laser_sound').
+        '''
+        sound = getattr(self, name)
+        if sound is not None:
+            self.audio.play(name, sound)
     
-    def groups(self):
+    def groups(self, pool_sizes=None):
+        '''
+        Creates the sprite groups used by the game, and the pools that recycle their short-lived sprites.
+
+        Parameters:
+        - pool_sizes: Maximum number of dead sprites kept for reuse, by pool name.
+        '''
+        pool_sizes = pool_sizes or {}
         self.all_sprites = pygame.sprite.Group()
         self.meteor_sprites = pygame.sprite.Group()
         self.laser_sprites = pygame.sprite.Group()
+        self.pools = {
+            'laser': Pool(Laser, (self.all_sprites, self.laser_sprites), pool_sizes.get('laser', 64)),
+            'meteor': Pool(Meteor, (self.all_sprites, self.meteor_sprites), pool_sizes.get('meteor', 256)),
+        }
 
-    def animated_sprites(self, image, frames, matrix, image_size):
-        images_frames = []
-        count = 1
-        for y in range (matrix[0]):
-            for x in range(matrix[1]):
-                if count <= frames:
-                    images_frames.append(image.subsurface(pygame.Rect(x * image_size[0], y * image_size[1], image_size[0], image_size[1])))
-                    count += 1
-        return images_frames
\ No newline at end of file
+    def build_masks(self, surfaces):
+        '''
+        Caches a collision mask for each surface.
+
+        Parameters:
+        - surfaces: The surfaces (sprite frames) to build masks for.
+
+        Sets:
+        - masks: A dictionary mapping each surface to its mask.
+        '''
+        for surface in surfaces:
+            if surface not in self.masks:
+                self.masks[surface] = pygame.mask.from_surface(surface)
+
+    def rotation_frames(self, frames):
+        '''
+        Prepares the rotation cache of an image for blitting: the frames come pre-rotated from the atlas,
+        evenly spaced so that index i holds the image rotated by i * 360 / len(frames) degrees.
+
+        Parameters:
+        - frames: The rotated surfaces.
+
+        Returns:
+        - The same frames.
+        '''
+        # Run-length encode the frames: their transparent corners are then skipped when blitting.
+        for frame in frames:
+            frame.set_alpha(255, pygame.RLEACCEL)
+        return frames
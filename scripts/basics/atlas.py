@@ -0,0 +1,166 @@
+import pygame
+import os
+import json
+import mmap
+import struct
+import tempfile
+
+class Atlas():
+    '''
+    Every sprite frame of the game packed into one image, baked once into a cache file of raw pixels
+    that later launches memory-map instead of decoding and slicing the PNGs again.
+    '''
+    # Cache file layout: magic, header length, JSON header, then the atlas pixels as raw RGBA rows.
+    MAGIC = b'SSATLAS1'
+    HEADER = struct.Struct('<8sI')
+    # Source images baked into the atlas.
+    SOURCES = ('player.png', 'laser.png', 'meteor.png', 'star.png', 'explosion.png')
+    # Width of the atlas; frames are packed in rows (shelves) of this width.
+    WIDTH = 2048
+
+    def __init__(self, images_dir, cache_path, rotation_steps=64):
+        '''
+        Initializes the Atlas class.
+
+        Parameters:
+        - images_dir: The directory of the source images;
+        - cache_path: The path of the baked cache file;
+        - rotation_steps: Number of pre-rotated meteor frames baked into the atlas.
+
+        Attributes:
+        - surface: The atlas image straight from the cache file, before conversion;
+        - sprites: A dictionary mapping each sprite name to the [x, y, width, height] of its frames;
+        - baked: Whether the cache was missing or stale and had to be baked during this launch.
+        '''
+        self.images_dir = images_dir
+        self.cache_path = cache_path
+        self.rotation_steps = rotation_steps
+        self.surface = None
+        self.sprites = {}
+        self.baked = False
+
+    def signature(self):
+        '''
+        Identifies the sources of the atlas: the cache is stale as soon as any of them changes.
+
+        Returns:
+        - A dictionary of the bake parameters and of the modification time and size of every source image.
+        '''
+        sources = {}
+        for name in self.SOURCES:
+            stat = os.stat(os.path.join(self.images_dir, name))
+            sources[name] = [stat.st_mtime_ns, stat.st_size]
+        return {'rotation_steps': self.rotation_steps, 'width': self.WIDTH, 'sources': sources}
+
+    def load(self):
+        '''
+        Memory-maps the cache file, baking it first when it is missing or stale (runs on a worker thread).
+        '''
+        signature = self.signature()
+        if not self.read(signature):
+            self.bake(signature)
+            self.baked = True
+            self.read(signature)
+
+    def read(self, signature):
+        '''
+        Maps the cache file and wraps its pixels in a surface without copying them.
+
+        Parameters:
+        - signature: The expected signature of the cache.
+
+        Returns:
+        - Whether the cache exists, can be read and matches the signature.
+        '''
+        try:
+            with open(self.cache_path, 'rb') as file:
+                pixels = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        magic, length = self.HEADER.unpack_from(pixels) if len(pixels) >= self.HEADER.size else (None, 0)
+        if magic != self.MAGIC:
+            pixels.close()
+            return False
+        view = memoryview(pixels)
+        try:
+            header = json.loads(pixels[self.HEADER.size:self.HEADER.size + length])
+            if header['signature'] != signature:
+                view.release()
+                pixels.close()
+                return False
+            sprites = header['sprites']
+            # The surface keeps the mapping alive until it is converted.
+            self.surface = pygame.image.frombuffer(view[self.HEADER.size + length:], header['size'], 'RGBA')
+        except (ValueError, KeyError, TypeError, json.JSONDecodeError):
+            # A truncated, corrupt or older cache is rebaked instead of failing the launch.
+            view.release()
+            pixels.close()
+            return False
+        self.sprites = sprites
+        return True
+
+    def bake(self, signature):
+        '''
+        Decodes the source images, builds the meteor rotations and explosion frames,
+        packs every frame into the atlas and writes it to the cache file.
+
+        Parameters:
+        - signature: The signature stored in the cache.
+        '''
+        images = {name: pygame.image.load(os.path.join(self.images_dir, name)) for name in self.SOURCES}
+        frames = {
+            'ship': [images['player.png']],
+            'laser': [images['laser.png']],
+            'meteor': [images['meteor.png']],
+            'star': [images['star.png']],
+            # Evenly spaced rotations: index i holds the meteor rotated by i * 360 / rotation_steps degrees.
+            'meteor_rotations': [pygame.transform.rotozoom(images['meteor.png'], index * 360 / self.rotation_steps, 1) for index in range(self.rotation_steps)],
+            # The 21 frames of the 5x5 explosion sheet.
+            'explosion': [images['explosion.png'].subsurface((index % 5 * 50, index // 5 * 50, 50, 50)) for index in range(21)],
+        }
+        sprites, size = self.pack(frames)
+        atlas = pygame.Surface(size, pygame.SRCALPHA, 32)
+        for name, rects in sprites.items():
+            atlas.fblits([(frame, rect[:2]) for frame, rect in zip(frames[name], rects)])
+        header = json.dumps({'signature': signature, 'size': size, 'sprites': sprites}).encode('utf-8')
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        # Written to a temporary file and renamed, so a crash mid-write never leaves a truncated cache.
+        with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(self.cache_path), suffix='.tmp', delete=False) as file:
+            file.write(self.HEADER.pack(self.MAGIC, len(header)))
+            file.write(header)
+            file.write(pygame.image.tobytes(atlas, 'RGBA'))
+        os.replace(file.name, self.cache_path)
+
+    def pack(self, frames):
+        '''
+        Places frames in rows from the tallest to the shortest, starting a new row when one is full.
+
+        Parameters:
+        - frames: A dictionary mapping each sprite name to its list of surfaces.
+
+        Returns:
+        - A tuple (sprites, size): the [x, y, width, height] of every frame by sprite name, and the atlas size.
+        '''
+        order = sorted(((frame.get_height(), name, index) for name, surfaces in frames.items() for index, frame in enumerate(surfaces)), reverse=True)
+        sprites = {name: [None] * len(surfaces) for name, surfaces in frames.items()}
+        x = y = row_height = 0
+        for height, name, index in order:
+            width = frames[name][index].get_width()
+            if x + width > self.WIDTH:
+                x, y, row_height = 0, y + row_height, 0
+            sprites[name][index] = [x, y, width, height]
+            x += width
+            row_height = max(row_height, height)
+        return sprites, [self.WIDTH, y + row_height]
+
+    def frames(self):
+        '''
+        Converts the atlas for fast blitting and cuts it into frames (runs on the main thread).
+
+        Returns:
+        - A dictionary mapping each sprite name to its list of subsurfaces.
+        '''
+        atlas = self.surface.convert_alpha()
+        # Release the raw pixels and, with them, the file mapping.
+        self.surface = None
+        return {name: [atlas.subsurface(rect) for rect in rects] for name, rects in self.sprites.items()}
@@ -0,0 +1,106 @@
+import pygame
+from collections import deque
+
+class Audio():
+    '''
+    Plays sounds on reserved channel groups with a cap on concurrent voices per sound,
+    streams the music, and applies the main volume to both.
+    '''
+    def __init__(self, settings):
+        '''
+        Initializes the Audio class, reserving the channels of every group.
+
+        Parameters:
+        - settings: The game settings; the 'audio' section holds the main volume,
+        the channel groups ('channels': group -> number of channels) and, for every sound,
+        its group and voice limit ('sounds': name -> {'channels', 'voices'}).
+
+        Attributes:
+        - groups: The channels of each group, oldest voice first;
+        - voices: The channels playing each sound, oldest first.
+        '''
+        self.settings = settings
+        self.version = None
+        self.groups = {}
+        self.voices = {}
+        self.mixer = None
+        self.setup()
+
+    def setup(self):
+        '''
+        Reserves the channels of every group, so sounds played elsewhere never take them.
+        Called again whenever the mixer was restarted.
+
+        Returns:
+        - Whether the mixer is running.
+        '''
+        self.mixer = pygame.mixer.get_init()
+        if not self.mixer:
+            return False
+        groups = self.settings.audio_settings['channels']
+        total = sum(groups.values())
+        pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(total)
+        first = 0
+        for group, count in groups.items():
+            self.groups[group] = deque(pygame.mixer.Channel(index) for index in range(first, first + count))
+            first += count
+        self.voices = {name: deque() for name in self.settings.audio_settings['sounds']}
+        self.version = None
+        return True
+
+    def ready(self):
+        '''
+        Whether sounds can play, setting the channels up again if the mixer was restarted
+        (resizing the screen quits it) and applying volume changes.
+        '''
+        if not self.mixer or pygame.mixer.get_init() != self.mixer:
+            if not self.setup():
+                return False
+        if self.settings.version != self.version:
+            self.version = self.settings.version
+            self.volume = self.settings.audio_settings['main_volume'] / 100
+            pygame.mixer.music.set_volume(self.volume)
+        return True
+
+    def play(self, name, sound):
+        '''
+        Plays a sound on a free channel of its group. When the sound already plays on as many voices as allowed,
+        or when every channel of the group is busy, the oldest voice is stopped and its channel reused.
+
+        Parameters:
+        - name: The sound name, a key of the 'sounds' audio setting;
+        - sound: The sound to play.
+        '''
+        if not self.ready():
+            return
+        config = self.settings.audio_settings['sounds'][name]
+        group = self.groups[config['channels']]
+        # Forget the voices that finished, or whose channel was taken by another sound.
+        voices = self.voices[name] = deque(channel for channel in self.voices[name] if channel.get_sound() is sound)
+        if len(voices) >= config['voices']:
+            channel = voices.popleft()
+        else:
+            channel = next((channel for channel in group if not channel.get_busy()), group[0])
+        # The channel now holds the newest voice of its group.
+        group.remove(channel)
+        group.append(channel)
+        if channel in voices:
+            voices.remove(channel)
+        voices.append(channel)
+        channel.play(sound)
+        channel.set_volume(self.volume)
+
+    def play_music(self, path, loops=-1):
+        '''
+        Streams a music file from disk instead of decoding it whole into memory.
+
+        Parameters:
+        - path: The path of the music file;
+        - loops: Number of extra repeats (-1 loops forever).
+        '''
+        if not self.ready():
+            return
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(loops)
@@ -0,0 +1,63 @@
+class GameClock():
+    '''
+    Game time: frame times scaled by a speed factor, frozen while paused.
+    Gameplay timers read it instead of the wall clock, so the game can be paused, sped up or simulated faster than real time.
+    Scenes with a fixed-step simulation advance it step by step, so it always matches the simulated time.
+    '''
+    def __init__(self, scale=1):
+        '''
+        Initializes the GameClock class.
+
+        Parameters:
+        - scale: Game seconds elapsed per real second, always positive (e.g. 10 runs the game ten times faster).
+
+        Attributes:
+        - time: Game time elapsed, in seconds;
+        - dt: Game time elapsed during the last frame, in seconds;
+        - paused: Whether game time is stopped.
+        '''
+        self.scale = scale
+        self.time = 0
+        self.dt = 0
+        self.paused = False
+
+    def scale_frame(self, frame_time):
+        '''
+        Converts a frame's real time to game time, without advancing the clock.
+
+        Parameters:
+        - frame_time: Real time elapsed since the last frame, in seconds.
+
+        Returns:
+        - The game time elapsed during the frame, in seconds (0 while paused).
+        '''
+        self.dt = 0 if self.paused else frame_time * self.scale
+        return self.dt
+
+    def advance(self, step):
+        '''
+        Advances game time by a simulation step.
+
+        Parameters:
+        - step: Duration of the step, in seconds of game time.
+        '''
+        self.time += step
+
+    def tick(self, frame_time):
+        '''
+        Advances game time by a whole frame, for scenes without a fixed-step simulation.
+
+        Parameters:
+        - frame_time: Real time elapsed since the last frame, in seconds.
+
+        Returns:
+        - The game time elapsed during the frame, in seconds (0 while paused).
+        '''
+        self.advance(self.scale_frame(frame_time))
+        return self.dt
+
+    def get_ticks(self):
+        '''
+        Returns the game time in milliseconds, like pygame.time.get_ticks() does for real time.
+        '''
+        return int(self.time * 1000)
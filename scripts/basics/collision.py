@@ -0,0 +1,96 @@
+import pygame
+
+class Collision():
+    '''
+    Detects contacts between sprite groups once per frame, using a uniform spatial hash as broadphase.
+    '''
+    def __init__(self, width, height, cell_size=128):
+        '''
+        Initializes the Collision class.
+
+        Parameters:
+        - width: Width of the logical space covered by the grid;
+        - height: Height of the logical space covered by the grid;
+        - cell_size: Side of each square grid cell, in pixels.
+
+        Attributes:
+        - columns: Number of cells along the x axis;
+        - rows: Number of cells along the y axis;
+        - cells: One bucket per cell, holding the indices of the targets that overlap it.
+        '''
+        self.cell_size = cell_size
+        self.columns = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+        self.cells = [[] for _ in range(self.columns * self.rows)]
+        self.targets = []
+
+    def cell_range(self, rect):
+        '''
+        Finds the grid cells covered by a rect, clamped to the grid so off-screen sprites land on the border cells.
+
+        Parameters:
+        - rect: The rect to locate.
+
+        Returns:
+        - A tuple (first_column, last_column, first_row, last_row).
+        '''
+        first_column = min(max(int(rect.left // self.cell_size), 0), self.columns - 1)
+        last_column = min(max(int(rect.right // self.cell_size), 0), self.columns - 1)
+        first_row = min(max(int(rect.top // self.cell_size), 0), self.rows - 1)
+        last_row = min(max(int(rect.bottom // self.cell_size), 0), self.rows - 1)
+        return first_column, last_column, first_row, last_row
+
+    def build(self, targets):
+        '''
+        Rebuilds the spatial hash with the given targets.
+
+        Parameters:
+        - targets: The sprites to insert, usually a group.
+        '''
+        for cell in self.cells:
+            cell.clear()
+        # Keep insertion order so contacts are always reported in the same order.
+        self.targets = list(targets)
+        for index, target in enumerate(self.targets):
+            first_column, last_column, first_row, last_row = self.cell_range(target.rect)
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    self.cells[row * self.columns + column].append(index)
+
+    def query(self, sprite):
+        '''
+        Finds the targets touching a sprite, testing masks only for the broadphase candidates.
+
+        Parameters:
+        - sprite: The sprite to test against the spatial hash.
+
+        Returns:
+        - A list of targets colliding with the sprite, in insertion order.
+        '''
+        first_column, last_column, first_row, last_row = self.cell_range(sprite.rect)
+        candidates = set()
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                candidates.update(self.cells[row * self.columns + column])
+        hits = []
+        for index in sorted(candidates):
+            target = self.targets[index]
+            if sprite.rect.colliderect(target.rect) and pygame.sprite.collide_mask(sprite, target):
+                hits.append(target)
+        return hits
+
+    def contacts(self, sprites):
+        '''
+        Finds every contact between some sprites and the targets of the last build.
+
+        Parameters:
+        - sprites: The moving sprites to test (lasers, the ship).
+
+        Returns:
+        - A list of (sprite, target) pairs, ordered by sprite and then by target.
+        '''
+        pairs = []
+        for sprite in sprites:
+            for target in self.query(sprite):
+                pairs.append((sprite, target))
+        return pairs
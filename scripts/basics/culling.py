@@ -0,0 +1,114 @@
+import numpy as np
+import pygame
+
+class Culling():
+    '''
+    Removes moving entities that left the view or outlived their type's maximum lifetime,
+    in one pass over the sprites, the meteor field and the particles.
+    Lifetimes are measured on the game clock, which follows simulated time, for sprites and the field alike.
+    '''
+    def __init__(self, width, height, settings):
+        '''
+        Initializes the Culling class.
+
+        Parameters:
+        - width: Width of the logical view;
+        - height: Height of the logical view;
+        - settings: The 'culling' settings: margin, in pixels, and lifetimes, in seconds by entity kind.
+
+        Attributes:
+        - bounds: The view grown by the margin. Entities outside it and not heading back in are removed;
+        - lifetimes: Maximum lifetime in seconds, by entity kind;
+        - culled: Number of entities removed so far, by reason ('bounds' or 'lifetime').
+        '''
+        margin = settings['margin']
+        self.bounds = pygame.FRect(-margin, -margin, width + margin * 2, height + margin * 2)
+        self.lifetimes = settings['lifetimes']
+        self.culled = {'bounds': 0, 'lifetime': 0}
+
+    def leaving(self, rect, velocity):
+        '''
+        Checks whether an entity is outside the bounds and moving away from them (or not moving).
+        Entities waiting outside on their way in, such as meteors spawned above the top edge, are kept.
+
+        Parameters:
+        - rect: The entity's rect;
+        - velocity: The entity's velocity.
+
+        Returns:
+        - True if the entity can be removed.
+        '''
+        bounds = self.bounds
+        return (rect.right < bounds.left and velocity[0] <= 0 or rect.left > bounds.right and velocity[0] >= 0
+                or rect.bottom < bounds.top and velocity[1] <= 0 or rect.top > bounds.bottom and velocity[1] >= 0)
+
+    def cull_sprites(self, sprites, time):
+        '''
+        Kills the sprites that left the view or outlived their kind's lifetime.
+
+        Parameters:
+        - sprites: An iterable of sprites with rect, velocity, kind and creation_time (game clock milliseconds) attributes;
+        - time: The current game clock time, in seconds.
+        '''
+        for sprite in list(sprites):
+            if self.leaving(sprite.rect, sprite.velocity):
+                sprite.kill()
+                self.culled['bounds'] += 1
+            elif time - sprite.creation_time / 1000 > self.lifetimes[sprite.kind]:
+                sprite.kill()
+                self.culled['lifetime'] += 1
+
+    def cull_field(self, field, time):
+        '''
+        Drops the meteors of a meteor field that left the view or outlived the meteor lifetime, in one vectorized pass.
+
+        Parameters:
+        - field: The MeteorField;
+        - time: The current game clock time, in seconds.
+        '''
+        live = slice(0, field.count)
+        half_sizes = field.half_sizes[field.frame_indices()]
+        leaving = self.leaving_arrays(field.positions[live] - half_sizes, field.positions[live] + half_sizes, field.velocities[live])
+        expired = ~leaving & (time - field.creation_times[live] > self.lifetimes['meteor'])
+        self.remove(field, leaving, expired)
+
+    def cull_particles(self, particles):
+        '''
+        Drops the particles that flew out of the view. Particles already die at the end of their own lifetime.
+
+        Parameters:
+        - particles: The ParticleSystem.
+        '''
+        live = slice(0, particles.count)
+        positions = particles.positions[live]
+        leaving = self.leaving_arrays(positions, positions, particles.velocities[live])
+        self.remove(particles, leaving, np.zeros_like(leaving))
+
+    def leaving_arrays(self, topleft, bottomright, velocities):
+        '''
+        Vectorized leaving(): checks many entities at once.
+
+        Parameters:
+        - topleft: Top-left corners, shape (count, 2);
+        - bottomright: Bottom-right corners, shape (count, 2);
+        - velocities: Velocities, shape (count, 2).
+
+        Returns:
+        - A boolean array, True for the entities that can be removed.
+        '''
+        bounds = self.bounds
+        return ((bottomright[:, 0] < bounds.left) & (velocities[:, 0] <= 0) | (topleft[:, 0] > bounds.right) & (velocities[:, 0] >= 0)
+                | (bottomright[:, 1] < bounds.top) & (velocities[:, 1] <= 0) | (topleft[:, 1] > bounds.bottom) & (velocities[:, 1] >= 0))
+
+    def remove(self, system, leaving, expired):
+        '''
+        Removes entities from an array-based system and counts them.
+
+        Parameters:
+        - system: A MeteorField or ParticleSystem;
+        - leaving: Boolean array of the entities removed for leaving the view;
+        - expired: Boolean array of the entities removed for outliving their lifetime.
+        '''
+        self.culled['bounds'] += int(np.count_nonzero(leaving))
+        self.culled['lifetime'] += int(np.count_nonzero(expired))
+        system.keep(~(leaving | expired))
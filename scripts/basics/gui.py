@@ -1,5 +1,50 @@
 import pygame
 import time
+from collections import OrderedDict
+
+class TextCache():
+    def __init__(self, max_bytes=4*1024*1024):
+        '''
+        Initializes a least-recently-used cache of rendered text surfaces.
+
+        Parameters:
+        - max_bytes: Memory cap for the cached pixels; the oldest surfaces are dropped above it.
+        '''
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.surfaces = OrderedDict()
+
+    def get(self, key):
+        '''
+        Returns a cached surface, marking it as recently used.
+
+        Parameters:
+        - key: Tuple (font, size, text, color, antialias, fit width).
+
+        Returns:
+        - The cached surface, or None if it is not cached.
+        '''
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def put(self, key, surface):
+        '''
+        Stores a surface, evicting the least recently used ones while over the memory cap.
+
+        Parameters:
+        - key: Tuple (font, size, text, color, antialias, fit width);
+        - surface: The rendered text surface.
+        '''
+        self.surfaces[key] = surface
+        self.bytes += surface.get_pitch() * surface.get_height()
+        while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, old_surface = self.surfaces.popitem(last=False)
+            self.bytes -= old_surface.get_pitch() * old_surface.get_height()
+
+# Rendered text shared by every text widget.
+text_cache = TextCache()
 
 class Text():
     def __init__(self, screen, text_color, text_antialias, font, font_size):
@@ -19,6 +64,31 @@ class Text():
         self.screen = screen
         self.text_color = text_color
         self.text_antialias = text_antialias
+        # Font file and size, used to key the rendered text cache.
+        self.font = font
+        self.font_size = font_size
+
+    def render(self, text, color, fit_width=0):
+        '''
+        Renders text through the shared cache, so unchanged text is only rendered once.
+
+        Parameters:
+        - text: The string to render;
+        - color: Color of the text;
+        - fit_width: Width the text is scaled down to fit in, minus 20 for padding (0 for no limit).
+
+        Returns:
+        - The rendered text surface.
+        '''
+        key = (self.font, self.font_size, text, tuple(color), self.text_antialias, fit_width)
+        text_surf = text_cache.get(key)
+        if text_surf is None:
+            text_surf = self.text_font.render(text, self.text_antialias, color)
+            # If the width is smaller than the text's width, scale the text down.
+            if fit_width < text_surf.get_width() and fit_width != 0:
+                text_surf = pygame.transform.scale_by(text_surf, (fit_width-20) / text_surf.get_width())
+            text_cache.put(key, text_surf)
+        return text_surf
 
 class Label(Text):
     def __init__(self, screen, text_color=(0,0,0), text_antialias=True, font=None, font_size=100, border_radius=0, border_color=(0,0,0), border_width=2, border_padding=0):
@@ -38,6 +108,27 @@ class Label(Text):
         self.border_width = border_width
         self.border_padding = border_padding
     
+    def measure(self, text, pos, center_w=False, center_h=False):
+        '''
+        Finds the area write() would cover, without drawing.
+
+        Parameters:
+        - text: The string to be displayed;
+        - pos: Tuple (x, y) indicating the position on the screen;
+        - center_w: Boolean to center the text horizontally around pos[0];
+        - center_h: Boolean to center the text vertically around pos[1].
+
+        Returns:
+        - The area of the screen covered by the text and its border.
+        '''
+        text_surf = self.render(str(text), self.text_color)
+        center_width = text_surf.get_width() / 2 if center_w else 0
+        center_height = text_surf.get_height() / 2 if center_h else 0
+        text_rect = text_surf.get_frect(topleft=(pos[0] - center_width, pos[1] - center_height))
+        border_rect = text_rect.inflate(self.border_padding, -self.border_padding).move(0, -self.border_padding/1.5)
+        # Whole pixels around the fractional areas.
+        return pygame.Rect(text_rect.union(border_rect)).inflate(2, 2)
+
     def write(self, text, pos, center_w=False, center_h=False):
         '''
         Renders and draws text on the screen.
@@ -47,16 +138,20 @@ class Label(Text):
         - pos: Tuple (x, y) indicating the position on the screen;
         - center_w: Boolean to center the text horizontally around pos[0];
         - center_h: Boolean to center the text vertically around pos[1].
+
+        Returns:
+        - The area of the screen covered by the text and its border.
         '''
         # Render the text as a surface with the specified font, color, and antialiasing.
-        text_surf = self.text_font.render(str(text), self.text_antialias, self.text_color)
+        text_surf = self.render(str(text), self.text_color)
         # Calculate offsets for centering the text, if enabled.
         center_width = text_surf.get_width() / 2 if center_w else 0
         center_height = text_surf.get_height() / 2 if center_h else 0
         text_rect = text_surf.get_frect(topleft=(pos[0] - center_width, pos[1] - center_height))
         # Blit the text surface onto the screen at the adjusted position.
-        self.screen.blit(text_surf, (pos[0] - center_width, pos[1] - center_height))
-        pygame.draw.rect(self.screen, self.border_color, text_rect.inflate(self.border_padding, -self.border_padding).move(0, -self.border_padding/1.5), self.border_width, self.border_radius)
+        text_area = self.screen.blit(text_surf, (pos[0] - center_width, pos[1] - center_height))
+        border_area = pygame.draw.rect(self.screen, self.border_color, text_rect.inflate(self.border_padding, -self.border_padding).move(0, -self.border_padding/1.5), self.border_width, self.border_radius)
+        return text_area.union(border_area)
 
 class TextButton(Text):
     def __init__(self, screen, text_color, text_antialias, font, font_size):
@@ -82,12 +177,8 @@ class TextButton(Text):
         - buttom_width: The maximum width allowed for the text (0 for no limit);
         - center: Boolean to center the text both horizontally and vertically around pos;
         '''
-        # Render the text as a surface.
-        text_surf = self.text_font.render(text, self.text_antialias, self.text_color)
-        # If the button's width is smaller than the text's width, scale the text down.
-        if buttom_width < text_surf.get_width() and buttom_width != 0:
-            # Scale the text surface to fit within the button width (subtracting 20 for padding).
-            text_surf = pygame.transform.scale_by(text_surf, (buttom_width-20) / text_surf.get_width())
+        # Render the text as a surface, scaled down to fit within the button width (subtracting 20 for padding).
+        text_surf = self.render(text, self.text_color, buttom_width)
         # Calculate offsets for centering the text, if enabled.
         center_width = text_surf.get_width() / 2 if center else 0
         center_height = text_surf.get_height() / 2 if center else 0
@@ -97,15 +188,13 @@ class TextButton(Text):
 class TextBoxContent(Text):
     def __init__(self, screen, text_color, text_antialias, font, font_size):
         super().__init__(screen, text_color, text_antialias, font, font_size)
-        self.text_surf = self.text_font.render('', self.text_antialias, self.text_color)
+        self.text_surf = self.render('', self.text_color)
     
     def write(self, text, pos, offset, text_box_size, padding, center_h=True):
-        self.text_surf = self.text_font.render(text, self.text_antialias, self.text_color)
+        self.text_surf = self.render(text, self.text_color)
         center_height = text_box_size[1]/3 if center_h else 0
-        clip_surface = pygame.Surface(((text_box_size[0]-(padding*2)), text_box_size[1]), pygame.SRCALPHA)
-        clip_surface.fill((0,0,0,0))
-        clip_surface.blit(self.text_surf, (-offset, 0))
-        self.screen.blit(clip_surface, ((pos[0]+padding), pos[1]+center_height))
+        # Blit only the visible part of the text, clipped to the text box without an intermediate surface.
+        self.screen.blit(self.text_surf, ((pos[0]+padding), pos[1]+center_height), pygame.Rect(offset, 0, text_box_size[0]-(padding*2), text_box_size[1]))
 
 ### REVIEW ###
 class Button(TextButton):
@@ -173,6 +262,8 @@ class Button(TextButton):
         self.transparency = transparency
         # Tracks whether the button is currently pressed.
         self.pressed = False
+        # Clicks received from the mouse events and not yet taken by click().
+        self.clicks = 0
         self.visible = visible
         
     def draw(self, text):
@@ -192,47 +283,79 @@ class Button(TextButton):
             # Draw the text at the center of the button.
             self.write(text, (self.button_rect.centerx, self.button_rect.centery), self.button_rect.width)
     
+    def hit_rect(self):
+        '''
+        Returns the clickable area of the button at rest, on the canvas.
+        '''
+        return pygame.Rect(self.button_x, self.button_y, self.button_rect.width, self.button_rect.height)
+
+    def hover(self, inside):
+        '''
+        Switches between the hover and normal looks as the mouse enters or leaves the button.
+
+        Parameters:
+        - inside: Whether the mouse is over the button.
+        '''
+        if inside:
+            # Change the button and text color for hover state.
+            self.current_button_color = self.button_hover_color
+            self.text_color = self.text_hover_color
+        else:
+            # Reset button state if the mouse is not over it.
+            self.button_rect.center = (self.pos[0], self.pos[1])
+            self.current_button_color = self.button_color
+            self.text_color = self.text_current_color
+            self.pressed = False
+
+    def mouse_down(self, pos, rect):
+        '''
+        Presses the button.
+
+        Parameters:
+        - pos: Mouse position on the display;
+        - rect: The button's clickable area on the display.
+        '''
+        # Move the button slightly to simulate a press (with shadow offset).
+        self.button_rect.center = (self.pos[0]+self.shadow_size[0], self.pos[1]+self.shadow_size[1])
+        self.pressed = True
+
+    def mouse_move(self, pos, rect):
+        '''
+        Handles the mouse moving while the button is held (nothing to do for buttons).
+        '''
+        pass
+
+    def mouse_up(self, pos, rect):
+        '''
+        Registers a click if the button is released where it was pressed.
+
+        Parameters:
+        - pos: Mouse position on the display;
+        - rect: The button's clickable area on the display.
+        '''
+        # Reset button position.
+        self.button_rect.center = (self.pos[0], self.pos[1])
+        if self.pressed and rect.collidepoint(pos):
+            self.clicks += 1
+        self.pressed = False
+
+    def blur(self):
+        '''
+        Handles a click elsewhere (nothing to do for buttons).
+        '''
+        pass
+
     def click(self) -> bool:
         '''
-        Handles mouse interaction with the button.
+        Takes one click registered by the mouse events; clicks made within a single frame are returned on the next calls.
 
         Returns:
         - True if the button was clicked, False otherwise.
         '''
-        if self.visible:
-            # Get the current mouse position.
-            mouse_pos = pygame.mouse.get_pos()
-            # Adjust the button's clickable area based on the aspect ratio.
-            updated_rect = pygame.Rect(self.button_x*self.aspect_ratio[0], self.button_y*self.aspect_ratio[1], self.button_rect.width*self.aspect_ratio[0], self.button_rect.height*self.aspect_ratio[1])
-            # Check if the mouse is within the updated rectangle.
-            if updated_rect.collidepoint(mouse_pos):
-                # Change the button and text color for hover state.
-                self.current_button_color = self.button_hover_color
-                self.text_color = self.text_hover_color
-                
-                # Check if the left mouse button is pressed.
-                if pygame.mouse.get_pressed()[0]:
-                    # Move the button slightly to simulate a press (with shadow offset).
-                    self.button_rect.center = (self.pos[0]+self.shadow_size[0], self.pos[1]+self.shadow_size[1])
-                    self.pressed = True
-                else:
-                    # If the button was pressed and is now released, register a click.
-                    if self.pressed:
-                        # Reset button position.
-                        self.button_rect.center = (self.pos[0], self.pos[1])
-                        self.pressed = False
-                        # Button click registered.
-                        return True
-            else:
-                # Reset button state if the mouse is not over it.
-                self.button_rect.center = (self.pos[0], self.pos[1])
-                self.current_button_color = self.button_color
-                self.text_color = self.text_current_color
-                self.pressed = False
-                # Button was not clicked.
-                return False
-        else:
-            return False
+        if self.clicks:
+            self.clicks -= 1
+            return True
+        return False
 
 class Slider(Button):
     def __init__(self, screen, aspect_ratio, pos, slider_value, size=(300, 30), multiplier=1, button_color = (100,100,100), button_hover_color = (100,100,100), border_radius = 20, padding = 20, pointer_radius = 8):
@@ -260,7 +383,10 @@ class Slider(Button):
         # Scaling factor for slider values.
         self.multiplier = multiplier
         # Calculate the initial pointer position based on the slider value.
+        self.slider_value = slider_value
         self.pointer_pos = int(((self.button_rect.width - self.padding*2) * slider_value / 100) / multiplier) + self.padding
+        # Whether the value changed since click_slider() was last called.
+        self.changed = False
 
     def draw_slider(self):
         '''
@@ -277,34 +403,63 @@ class Slider(Button):
         # Draw the slider pointer as a circle
         pygame.draw.circle(self.screen, (0,0,0), (self.button_x + self.pointer_pos, self.button_y+self.button_rect.height/2), radius=self.pointer_radius)
     
+    def hit_rect(self):
+        '''
+        Returns the draggable area of the slider (its track), on the canvas.
+        '''
+        return pygame.Rect(self.button_x + self.padding, self.button_y, self.button_rect.width - self.padding*2, self.button_rect.height)
+
+    def hover(self, inside):
+        '''
+        The slider keeps the same look under the mouse.
+        '''
+        pass
+
+    def mouse_down(self, pos, rect):
+        '''
+        Starts dragging the pointer to the mouse position.
+
+        Parameters:
+        - pos: Mouse position on the display;
+        - rect: The slider track on the display.
+        '''
+        self.pressed = True
+        self.mouse_move(pos, rect)
+
+    def mouse_move(self, pos, rect):
+        '''
+        Moves the pointer with the mouse while dragging over the track.
+
+        Parameters:
+        - pos: Mouse position on the display;
+        - rect: The slider track on the display.
+        '''
+        if self.pressed and rect.collidepoint(pos):
+            # Calculate the slider value based on the pointer's position.
+            self.slider_value = round(((pos[0] - rect.x)*100/rect.width)*self.multiplier)
+            self.pointer_pos = int(((self.button_rect.width - self.padding*2) * self.slider_value / 100) / self.multiplier) + self.padding
+            self.changed = True
+
+    def mouse_up(self, pos, rect):
+        '''
+        Stops dragging.
+        '''
+        self.pressed = False
+
     def click_slider(self):
         '''
-        Handles mouse interaction with the slider.
+        Reports whether the mouse events moved the slider since the last call.
 
         Returns:
-        - True if the slider was clicked and value was updated;
+        - True if the slider value was updated;
         - False otherwise.
         '''
-        # Get the current mouse position.
-        mouse_pos = pygame.mouse.get_pos()
-        # Adjust the slider's clickable area based on the aspect ratio.
-        updated_rect = pygame.Rect((self.button_x + self.padding)*self.aspect_ratio[0], self.button_y*self.aspect_ratio[1], (self.button_rect.width-self.padding*2)*self.aspect_ratio[0], self.button_rect.height*self.aspect_ratio[1])
-        # Check if the mouse is within the slider's clickable area.
-        if updated_rect.collidepoint(mouse_pos):
-            # Check if the left mouse button is pressed.
-            if pygame.mouse.get_pressed()[0]:
-                # Update the pointer position relative to the mouse.
-                self.pointer_pos =  mouse_pos[0] - updated_rect.x
-                # Calculate the slider value based on the pointer's position.
-                self.slider_value = round((self.pointer_pos*100/updated_rect.width)*self.multiplier)
-                self.pointer_pos = int(((self.button_rect.width - self.padding*2) * self.slider_value / 100) / self.multiplier) + self.padding
-                # Slider value was updated.
-                return True
-        # Slider was not clicked or updated.
-        return False
+        changed = self.changed
+        self.changed = False
+        return changed
 
 class TextBox(TextBoxContent):
-    def __init__(self, screen, aspect_ratio, pos, size=(300, 100), visible=True, display_text='', text_padding=10, password=False, text_color=(0,0,0), display_text_color=(0,0,0), text_antialias=True, text_font=None, text_font_size=40, tb_color=(128,128,128), border=-1, border_color=(0,0,0), border_radius=0, transparency=0):
+    def __init__(self, screen, aspect_ratio, pos, size=(300, 100), visible=True, display_text='', text_padding=10, password=False, text_color=(0,0,0), display_text_color=(0,0,0), text_antialias=True, text_font=None, text_font_size=40, tb_color=(128,128,128), border=-1, border_color=(0,0,0), border_radius=0, transparency=0, clock=None):
         '''
         Initializes the TextBox object, which is used for user text input.
 
@@ -321,10 +476,12 @@ class TextBox(TextBoxContent):
         - border: Thickness of the border around the text box. Default is -1 (no border);
         - border_color: Color of the border. Default is (0, 0, 0);
         - border_radius: Radius of the corners for the text box. Default is 0 (no rounding);
-        - transparency: Transparency level of the text box. Default is 0 (fully opaque).
+        - transparency: Transparency level of the text box. Default is 0 (fully opaque);
+        - clock: Object with a get_ticks() method timing the cursor blink. Default is None (pygame.time, real time).
         '''
         super().__init__(screen, text_color, text_antialias, text_font, text_font_size)
         self.screen = screen
+        self.clock = clock or pygame.time
         self.aspect_ratio = aspect_ratio
         self.pos = pos
         # Text input by the user
@@ -348,7 +505,27 @@ class TextBox(TextBoxContent):
         self.display_text_label = Label(screen, font_size=text_font_size, font=text_font, text_color=display_text_color)
         self.bar_text_label = Label(screen, font_size=text_font_size, font=text_font)
         self.text_padding = text_padding
+        # Time the text box was last selected, when the cursor blink starts.
+        self.start_blink = 0
         
+    def cursor_visible(self):
+        '''
+        Whether the blinking cursor is shown: always during the first second after selecting the text box,
+        then every other second.
+        '''
+        if not self.pressed:
+            return False
+        self.blink_time = self.clock.get_ticks() - self.start_blink
+        return self.blink_time <= 1000 or (self.blink_time//1000) % 2 == 0
+
+    def next_blink(self):
+        '''
+        Returns the milliseconds left until the cursor blinks, or None while the text box is not selected.
+        '''
+        if not self.pressed:
+            return None
+        return 1000 - (self.clock.get_ticks() - self.start_blink) % 1000
+
     def draw(self):
         '''
         Draws the text box on the screen.
@@ -376,35 +553,48 @@ class TextBox(TextBoxContent):
             # Blinking logic
             if self.text == '':
                 self.display_text_label.write(self.display_text, (self.tb_x+self.text_padding, self.tb_y + self.tb_rect.height/3))
-            if self.pressed:
-                self.blink_time = pygame.time.get_ticks() - self.start_blink
-                if self.blink_time <= 1000:
-                    self.bar_text_label.write('|', (self.tb_x+self.text_surf.width+self.text_padding/2, self.tb_y + self.tb_rect.height/2), center_h=True)
-                elif (self.blink_time//1000) % 2 == 0:
-                    self.bar_text_label.write('|', (self.tb_x+self.text_surf.width+self.text_padding/2, self.tb_y + self.tb_rect.height/2), center_h=True)
-            else:
-                self.start_blink = pygame.time.get_ticks()
+            if self.cursor_visible():
+                self.bar_text_label.write('|', (self.tb_x+self.text_surf.width+self.text_padding/2, self.tb_y + self.tb_rect.height/2), center_h=True)
     
-    def click(self):
+    def hit_rect(self):
+        '''
+        Returns the clickable area of the text box, on the canvas.
         '''
-        Handles mouse interaction with the text box.
+        return pygame.Rect(self.tb_rect)
 
-        Returns:
-        - True if the text box was clicked;
-        - False otherwise.
+    def hover(self, inside):
         '''
-        if self.visible:
-            # Get the current mouse position
-            mouse_pos = pygame.mouse.get_pos()
-            # Adjust the text box rectangle for different screen aspect ratios
-            updated_rect = pygame.Rect(self.tb_x*self.aspect_ratio[0], self.tb_y*self.aspect_ratio[1], self.tb_rect.width*self.aspect_ratio[0], self.tb_rect.height*self.aspect_ratio[1])
-            # If the mouse click is within the text box, set the 'pressed' flag to True
-            if updated_rect.collidepoint(mouse_pos) and pygame.mouse.get_pressed()[0]:
-                self.pressed = True
-            elif pygame.mouse.get_pressed()[0]:
-                # If mouse is released outside, set the 'pressed' flag to False
-                self.pressed = False
-    
+        The text box keeps the same look under the mouse.
+        '''
+        pass
+
+    def mouse_down(self, pos, rect):
+        '''
+        Selects the text box, so it receives the typed keys.
+        '''
+        if not self.pressed:
+            # Restart the cursor blink when the text box gets selected.
+            self.start_blink = self.clock.get_ticks()
+        self.pressed = True
+
+    def mouse_move(self, pos, rect):
+        '''
+        Handles the mouse moving while the text box is held (nothing to do for text boxes).
+        '''
+        pass
+
+    def mouse_up(self, pos, rect):
+        '''
+        Handles the mouse button release (nothing to do for text boxes).
+        '''
+        pass
+
+    def blur(self):
+        '''
+        Deselects the text box after a click elsewhere.
+        '''
+        self.pressed = False
+
     def event(self, event):
         '''
         Handles keyboard events to capture user input when the text box is clicked.
@@ -427,6 +617,176 @@ class TextBox(TextBoxContent):
                     # Add the character pressed to the user text
                     self.text += event.unicode
 
+class HitIndex():
+    def __init__(self, screen, cell_size=64):
+        '''
+        Initializes a grid of the widgets' clickable areas in display coordinates, scaled and offset once for the
+        current resolution, and dispatches mouse events to the widget under the mouse.
+        Rebuild it whenever the screen is resized.
+
+        Parameters:
+        - screen: The Screen, whose viewport offset and ratios map canvas areas to the display;
+        - cell_size: Size of the grid cells in display pixels.
+        '''
+        self.screen = screen
+        self.cell_size = cell_size
+        self.cells = {}
+        # Display area of each widget.
+        self.rects = {}
+        # Widget under the mouse, widget receiving the mouse until the button is released, and last clicked widget.
+        self.hovered = None
+        self.captured = None
+        self.focus = None
+
+    def add(self, widget):
+        '''
+        Indexes a widget's clickable area. Widgets added later are on top.
+
+        Parameters:
+        - widget: A widget with hit_rect(), hover(), mouse_down(), mouse_move(), mouse_up() and blur() methods.
+        '''
+        area = widget.hit_rect()
+        left = int(area.left * self.screen.width_ratio) + self.screen.offset[0]
+        top = int(area.top * self.screen.height_ratio) + self.screen.offset[1]
+        rect = pygame.Rect(left, top, int(area.right * self.screen.width_ratio) + self.screen.offset[0] - left, int(area.bottom * self.screen.height_ratio) + self.screen.offset[1] - top)
+        self.rects[widget] = rect
+        for x in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+            for y in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                self.cells.setdefault((x, y), []).append(widget)
+
+    def hit(self, pos):
+        '''
+        Finds the topmost visible widget at a display position.
+
+        Parameters:
+        - pos: Position on the display.
+
+        Returns:
+        - The widget, or None.
+        '''
+        for widget in reversed(self.cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size), ())):
+            if getattr(widget, 'visible', True) and self.rects[widget].collidepoint(pos):
+                return widget
+        return None
+
+    def dispatch(self, event):
+        '''
+        Routes a mouse event: hover changes to the widgets entered and left, the left button to the widget under the mouse,
+        then motion and release to that widget until the button is released, and a blur to the previously clicked widget.
+
+        Parameters:
+        - event: A pygame event; other events are ignored.
+        '''
+        if event.type not in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            return
+        if event.type != pygame.MOUSEMOTION and event.button != 1:
+            return
+        target = self.hit(event.pos)
+        if target is not self.hovered:
+            if self.hovered:
+                self.hovered.hover(False)
+            if target:
+                target.hover(True)
+            self.hovered = target
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.focus and self.focus is not target:
+                self.focus.blur()
+            self.focus = self.captured = target
+            if target:
+                target.mouse_down(event.pos, self.rects[target])
+        elif self.captured:
+            if event.type == pygame.MOUSEMOTION:
+                self.captured.mouse_move(event.pos, self.rects[self.captured])
+            else:
+                self.captured.mouse_up(event.pos, self.rects[self.captured])
+                self.captured = None
+
+class Widget():
+    def __init__(self, area=None, draw=None, state=None):
+        '''
+        Initializes a node of a retained widget tree. The tree only redraws the widgets whose visible state changed,
+        and whatever overlaps them, and reports the areas it redrew.
+
+        Parameters:
+        - area: Function returning the Rect the widget covers on its surface (None for grouping nodes).
+        A root covering the whole surface makes the first render paint the background everywhere;
+        - draw: Function drawing the widget (None for grouping nodes);
+        - state: Function returning everything the widget's look depends on (text, colors, hover and press state...);
+        a different value than at the last render marks the widget dirty.
+        '''
+        self.area = area
+        self.draw = draw
+        self.state = state
+        self.children = []
+        self.dirty = True
+        self.last_state = None
+        # Area covered when the widget was last drawn, cleared when it changes.
+        self.last_area = None
+
+    def add(self, child):
+        '''
+        Adds a child widget, drawn after its parent and the previous children.
+
+        Parameters:
+        - child: The Widget to add.
+
+        Returns:
+        - The child.
+        '''
+        self.children.append(child)
+        return child
+
+    def nodes(self):
+        '''
+        Yields the widget and all its descendants, in drawing order.
+        '''
+        yield self
+        for child in self.children:
+            yield from child.nodes()
+
+    def render(self, surface, background):
+        '''
+        Redraws the changed widgets of the tree onto the surface, clipped to the changed areas,
+        together with the widgets they overlap.
+
+        Parameters:
+        - surface: The surface the widgets draw on;
+        - background: Color filling the changed areas before the widgets are drawn again.
+
+        Returns:
+        - The list of areas redrawn (empty when nothing changed).
+        '''
+        nodes = [node for node in self.nodes() if node.area]
+        changed = []
+        for node in nodes:
+            state = node.state() if node.state else None
+            if node.dirty or state != node.last_state:
+                node.dirty = False
+                node.last_state = state
+                if node.last_area:
+                    changed.append(node.last_area)
+                changed.append(node.area())
+        # Merge overlapping areas so nothing is drawn twice.
+        areas = []
+        for area in changed:
+            for index, other in enumerate(areas):
+                if other.colliderect(area):
+                    areas[index] = other.union(area)
+                    break
+            else:
+                areas.append(area)
+        for area in areas:
+            surface.set_clip(area)
+            surface.fill(background)
+            for node in nodes:
+                node_area = node.area()
+                if node_area.colliderect(area):
+                    if node.draw:
+                        node.draw()
+                    node.last_area = node_area
+        surface.set_clip(None)
+        return areas
+
 class Panel():
     def __init__(self, screen, aspect_ratio, pos, size=(100,100), color=(128,128,128)):
         self.screen = screen
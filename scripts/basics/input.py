@@ -0,0 +1,171 @@
+import pygame
+
+class Input():
+    '''
+    Maps keyboard keys and gamepad controls to game actions.
+    The bindings in the settings are compiled to integer codes once, and again whenever the settings change,
+    and the devices are sampled once per frame into bitmasks with one bit per action.
+    '''
+    def __init__(self, settings):
+        '''
+        Initializes the Input class.
+
+        Parameters:
+        - settings: The game settings, whose 'keys' and 'gamepad' sections hold the bindings.
+
+        Attributes:
+        - actions: The action names, in bit order;
+        - held: Bitmask of the actions currently held down;
+        - pressed: Bitmask of the actions pressed since the last simulation step;
+        - released: Bitmask of the actions released since the last simulation step;
+        - gamepads: The connected gamepads, by instance id.
+        '''
+        self.settings = settings
+        self.version = None
+        self.held = 0
+        self.pressed = 0
+        self.released = 0
+        self.gamepads = {}
+        self.compile()
+
+    def compile(self):
+        '''
+        Turns the key names and gamepad bindings of the settings into integer codes.
+        Each action accepts a single binding or a list of bindings.
+
+        Gamepad bindings are written 'button <index>', 'axis <index> <+ or ->' or 'hat <index> <up, down, left or right>'.
+        '''
+        self.version = self.settings.version
+        keys = self.settings.controls
+        gamepad = self.settings.gamepad_controls
+        self.actions = list(keys)
+        self.bits = {action: 1 << index for index, action in enumerate(self.actions)}
+        # Pairs of (keycode, action bit).
+        self.key_bindings = []
+        for action, names in keys.items():
+            for name in names if isinstance(names, list) else [names]:
+                self.key_bindings.append((pygame.key.key_code(name), self.bits[action]))
+        # Lists of (index, action bit) for buttons, and of (index, direction, action bit) for axes and hats.
+        self.button_bindings = []
+        self.axis_bindings = []
+        self.hat_bindings = []
+        hat_directions = {'up': (1, 1), 'down': (1, -1), 'left': (0, -1), 'right': (0, 1)}
+        for action, bindings in gamepad['bindings'].items():
+            if action not in self.bits:
+                continue
+            for binding in bindings if isinstance(bindings, list) else [bindings]:
+                kind, index, *direction = binding.split()
+                if kind == 'button':
+                    self.button_bindings.append((int(index), self.bits[action]))
+                elif kind == 'axis':
+                    self.axis_bindings.append((int(index), -1 if direction[0] == '-' else 1, self.bits[action]))
+                elif kind == 'hat':
+                    self.hat_bindings.append((int(index), hat_directions[direction[0]], self.bits[action]))
+        self.deadzone = gamepad['deadzone']
+
+    def event(self, event):
+        '''
+        Opens gamepads as they are connected and forgets them when they are removed.
+
+        Parameters:
+        - event: A pygame event.
+        '''
+        if event.type == pygame.JOYDEVICEADDED:
+            gamepad = pygame.joystick.Joystick(event.device_index)
+            self.gamepads[gamepad.get_instance_id()] = gamepad
+        elif event.type == pygame.JOYDEVICEREMOVED:
+            self.gamepads.pop(event.instance_id, None)
+
+    def sample(self):
+        '''
+        Reads the keyboard and gamepads once for the frame, after the events were processed.
+        Presses and releases accumulate until a simulation step consumes them, so frames that run no step lose none.
+        '''
+        if self.settings.version != self.version:
+            self.compile()
+        held = 0
+        keys = pygame.key.get_pressed()
+        for key, bit in self.key_bindings:
+            if keys[key]:
+                held |= bit
+        for gamepad in self.gamepads.values():
+            for index, bit in self.button_bindings:
+                if index < gamepad.get_numbuttons() and gamepad.get_button(index):
+                    held |= bit
+            for index, direction, bit in self.axis_bindings:
+                if index < gamepad.get_numaxes() and gamepad.get_axis(index) * direction > self.deadzone:
+                    held |= bit
+            for index, (axis, direction), bit in self.hat_bindings:
+                if index < gamepad.get_numhats() and gamepad.get_hat(index)[axis] == direction:
+                    held |= bit
+        self.update(held)
+
+    def update(self, held):
+        '''
+        Sets the held actions, finding the presses and releases since the previous frame.
+
+        Parameters:
+        - held: Bitmask of the actions held down, sampled from the devices or taken from a replay.
+        '''
+        self.pressed |= held & ~self.held
+        self.released |= self.held & ~held
+        self.held = held
+
+    def consume(self):
+        '''
+        Clears the presses and releases once a simulation step has seen them.
+        '''
+        self.pressed = 0
+        self.released = 0
+
+    def take(self, action):
+        '''
+        Whether an action was pressed, clearing the press at once instead of at the next simulation step.
+        Used for actions that work while no step runs, such as pausing.
+
+        Parameters:
+        - action: The action name.
+        '''
+        pressed = self.is_pressed(action)
+        self.pressed &= ~self.bits[action]
+        return pressed
+
+    def is_held(self, action):
+        '''
+        Whether an action is held down.
+
+        Parameters:
+        - action: The action name.
+        '''
+        return bool(self.held & self.bits[action])
+
+    def is_pressed(self, action):
+        '''
+        Whether an action was pressed since the last simulation step.
+
+        Parameters:
+        - action: The action name.
+        '''
+        return bool(self.pressed & self.bits[action])
+
+    def is_released(self, action):
+        '''
+        Whether an action was released since the last simulation step.
+
+        Parameters:
+        - action: The action name.
+        '''
+        return bool(self.released & self.bits[action])
+
+    def axis(self, negative, positive):
+        '''
+        Combines two opposite actions into a direction.
+
+        Parameters:
+        - negative: The action pointing towards -1;
+        - positive: The action pointing towards +1.
+
+        Returns:
+        - -1, 0 or 1.
+        '''
+        return self.is_held(positive) - self.is_held(negative)
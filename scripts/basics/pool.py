@@ -0,0 +1,96 @@
+import pygame
+
+class PooledSprite(pygame.sprite.Sprite):
+    '''
+    Sprite that returns to its pool when killed, instead of being discarded.
+    Subclasses implement reset(image, *args) to reinitialize a reused sprite.
+    '''
+    pool = None
+    # Center before the last simulation step, used to interpolate drawing (None draws at the current center).
+    previous_center = None
+
+    def kill(self):
+        '''
+        Removes the sprite from all groups and hands it back to its pool.
+        Killing an already dead sprite does nothing, so it can never be pooled twice.
+        '''
+        if self.alive():
+            super().kill()
+            # A reused sprite must not be interpolated from its previous life.
+            self.previous_center = None
+            if self.pool is not None:
+                self.pool.release(self)
+
+class Pool():
+    '''
+    Reuses dead sprites of one type instead of allocating new ones.
+    '''
+    def __init__(self, sprite_type, groups, max_size=64):
+        '''
+        Initializes the Pool class.
+
+        Parameters:
+        - sprite_type: The PooledSprite subclass to create;
+        - groups: The sprite groups every acquired sprite is added to;
+        - max_size: Maximum number of dead sprites kept for reuse.
+
+        Attributes:
+        - free: Dead sprites waiting to be reused;
+        - live: Number of sprites currently in use;
+        - high_water: Highest number of sprites in use at the same time;
+        - created: Number of sprites allocated;
+        - reused: Number of sprites taken from the pool instead of allocated.
+        '''
+        self.sprite_type = sprite_type
+        self.groups = groups
+        self.max_size = max_size
+        self.free = []
+        self.live = 0
+        self.high_water = 0
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, game, image, *args):
+        '''
+        Returns a sprite, reusing a dead one when available.
+
+        Parameters:
+        - game: The game instance passed to the sprite;
+        - image: The image (or frames) of the sprite;
+        - args: Extra arguments of the sprite's constructor and reset method.
+
+        Returns:
+        - A sprite added to the pool's groups.
+        '''
+        if self.free:
+            sprite = self.free.pop()
+            sprite.add(*self.groups)
+            sprite.reset(image, *args)
+            self.reused += 1
+        else:
+            sprite = self.sprite_type(game, image, self.groups, *args)
+            sprite.pool = self
+            self.created += 1
+        self.live += 1
+        self.high_water = max(self.high_water, self.live)
+        return sprite
+
+    def release(self, sprite):
+        '''
+        Takes back a killed sprite, keeping it for reuse if the pool is not full.
+
+        Parameters:
+        - sprite: The dead sprite.
+        '''
+        self.live -= 1
+        if len(self.free) < self.max_size:
+            self.free.append(sprite)
+
+    def stats(self):
+        '''
+        Returns the pool counters, for tuning pool sizes.
+
+        Returns:
+        - A dictionary with the live, free, high_water, created and reused counts.
+        '''
+        return {'live': self.live, 'free': len(self.free), 'high_water': self.high_water, 'created': self.created, 'reused': self.reused}
@@ -0,0 +1,219 @@
+import csv
+import os
+import time
+from collections import deque
+import pygame
+
+class Section():
+    '''
+    Context manager that times one phase of a frame.
+    '''
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, (time.perf_counter() - self.start) * 1000)
+
+class NullSection():
+    '''
+    Context manager used while profiling is disabled, so instrumented code costs almost nothing.
+    '''
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+class Profiler():
+    '''
+    Times each phase of the frame, keeps rolling percentiles, draws a timing overlay and records a CSV trace.
+    '''
+    def __init__(self, enabled=False, overlay=False, trace_path=None, window=240, trace_chunk=240):
+        '''
+        Initializes the Profiler class.
+
+        Parameters:
+        - enabled: Whether phases are timed at all;
+        - overlay: Whether the timing overlay is drawn on the canvas;
+        - trace_path: Path of a CSV file receiving one row per frame, or None;
+        - window: Number of frames kept for the rolling percentiles;
+        - trace_chunk: Number of frames buffered before they are appended to the CSV trace.
+
+        Attributes:
+        - samples: Rolling per-frame timings in milliseconds, by phase name;
+        - current: Timings accumulated for the frame in progress, by phase name;
+        - counters: Rolling per-frame counts (draw calls, blits...), by counter name;
+        - current_counts: Counts accumulated for the frame in progress, by counter name;
+        - rows: Per-frame rows not yet written to the CSV trace;
+        - columns: Columns of the CSV trace written so far, or None before the first write.
+        '''
+        self.overlay = overlay
+        self.trace_path = trace_path
+        self.enabled = enabled or overlay or trace_path is not None
+        self.window = window
+        self.samples = {}
+        self.current = {}
+        self.counters = {}
+        self.current_counts = {}
+        self.rows = []
+        self.trace_chunk = trace_chunk
+        self.columns = None
+        self.frame_count = 0
+        self.frame_start = time.perf_counter()
+        self.null_section = NullSection()
+        self.font = None
+
+    def section(self, name):
+        '''
+        Times the code inside a with block.
+
+        Parameters:
+        - name: Name of the phase.
+
+        Returns:
+        - A context manager.
+        '''
+        if self.enabled:
+            return Section(self, name)
+        return self.null_section
+
+    def add(self, name, value):
+        '''
+        Adds a measurement to the frame in progress. A phase entered several times in a frame is summed.
+
+        Parameters:
+        - name: Name of the phase;
+        - value: Measured time in milliseconds (or any per-frame counter).
+        '''
+        self.current[name] = self.current.get(name, 0) + value
+
+    def count(self, name, value):
+        '''
+        Adds to a per-frame counter of the frame in progress. Counters are kept apart from the timings.
+
+        Parameters:
+        - name: Name of the counter;
+        - value: Amount to add.
+        '''
+        if self.enabled:
+            self.current_counts[name] = self.current_counts.get(name, 0) + value
+
+    def frame(self):
+        '''
+        Closes the frame in progress, storing its timings and the total frame time.
+        '''
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current['frame'] = (now - self.frame_start) * 1000
+        self.frame_start = now
+        for name, value in self.current.items():
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+            self.samples[name].append(value)
+        for name, value in self.current_counts.items():
+            if name not in self.counters:
+                self.counters[name] = deque(maxlen=self.window)
+            self.counters[name].append(value)
+        if self.trace_path is not None:
+            self.rows.append({'frame': self.frame_count, **{f'{name}_ms': value for name, value in self.current.items()}, **self.current_counts})
+            if len(self.rows) >= self.trace_chunk:
+                self.write_trace()
+        self.frame_count += 1
+        self.current = {}
+        self.current_counts = {}
+
+    def percentiles(self, name):
+        '''
+        Computes the rolling p50, p95 and p99 of a phase or a counter.
+
+        Parameters:
+        - name: Name of the phase or counter.
+
+        Returns:
+        - A tuple (p50, p95, p99) in milliseconds (or counts), or zeros when nothing was measured.
+        '''
+        values = sorted(self.samples.get(name) or self.counters.get(name, ()))
+        if not values:
+            return 0, 0, 0
+        last = len(values) - 1
+        return values[round(last * 0.5)], values[round(last * 0.95)], values[round(last * 0.99)]
+
+    def draw(self, surface, pos=(10, 10)):
+        '''
+        Draws a compact table of percentiles and a frame time graph on a surface.
+
+        Parameters:
+        - surface: The surface to draw on (usually the game canvas);
+        - pos: Top-left corner of the overlay.
+
+        Returns:
+        - The area covered by the overlay, or None when the overlay is disabled.
+        '''
+        if not self.overlay:
+            return None
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        x, y = pos
+        line_height = self.font.get_linesize()
+        lines = [f'{"phase":<16}{"p50":>7}{"p95":>7}{"p99":>7}']
+        for name in self.samples:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f'{name:<16}{p50:7.2f}{p95:7.2f}{p99:7.2f}')
+        for name in self.counters:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f'{name:<16}{p50:7.0f}{p95:7.0f}{p99:7.0f}')
+        graph_height = 40
+        background = pygame.Surface((260, line_height * len(lines) + graph_height + 10), pygame.SRCALPHA)
+        background.fill((0, 0, 0, 160))
+        area = surface.blit(background, pos)
+        for index, line in enumerate(lines):
+            surface.blit(self.font.render(line, True, (255, 255, 255)), (x + 5, y + 5 + index * line_height))
+        # Frame time graph, where the full height is 33 ms (30 FPS).
+        graph_bottom = y + 5 + line_height * len(lines) + graph_height
+        for index, value in enumerate(self.samples.get('frame', ())):
+            height = min(value / 33.3, 1) * graph_height
+            color = (80, 220, 80) if value <= 16.7 else (230, 200, 60) if value <= 33.3 else (230, 70, 70)
+            pygame.draw.line(surface, color, (x + 5 + index, graph_bottom), (x + 5 + index, graph_bottom - height))
+        return area
+
+    def write_trace(self):
+        '''
+        Appends the buffered rows to the CSV trace, so memory stays bounded and a crash loses at most one chunk.
+        A phase first seen after the header was written (e.g. once loading ends) adds a column:
+        the file is then rewritten once with the new header, earlier rows reading 0 in that column.
+        '''
+        if not self.rows:
+            return
+        columns = list(self.columns or ['frame'])
+        for row in self.rows:
+            for name in row:
+                if name not in columns:
+                    columns.append(name)
+        if self.columns is None or columns == self.columns:
+            with open(self.trace_path, 'w' if self.columns is None else 'a', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=columns, restval=0)
+                if self.columns is None:
+                    writer.writeheader()
+                writer.writerows(self.rows)
+        else:
+            temporary_path = self.trace_path + '.tmp'
+            with open(self.trace_path, newline='', encoding='utf-8') as source, open(temporary_path, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=columns, restval=0)
+                writer.writeheader()
+                writer.writerows(csv.DictReader(source))
+                writer.writerows(self.rows)
+            os.replace(temporary_path, self.trace_path)
+        self.columns = columns
+        self.rows = []
+
+    def close(self):
+        '''
+        Writes the rows of the CSV trace not written yet, if one was requested.
+        '''
+        if self.trace_path is not None:
+            self.write_trace()
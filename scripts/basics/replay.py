@@ -0,0 +1,115 @@
+import math
+import struct
+import zlib
+
+# File layout: header, action names separated by commas, then the zlib-compressed frames.
+# The header holds the magic, seed, meteor storm size, time scale and length of the action names.
+MAGIC = b'SSREPLY2'
+HEADER = struct.Struct('<8sQIdH')
+# One frame: the delta time in seconds and the bitmask of the held actions.
+FRAME = struct.Struct('<dI')
+
+class Recorder():
+    '''
+    Records the inputs of a session, to reproduce it later with Replay.
+    '''
+    def __init__(self, path, seed, storm_meteors, time_scale, actions):
+        '''
+        Initializes the Recorder class.
+
+        Parameters:
+        - path: The path of the replay file, written by close();
+        - seed: The random seed of the session;
+        - storm_meteors: The meteor storm size of the session;
+        - time_scale: The game clock scale of the session, since the recorded delta times are unscaled;
+        - actions: The input action names, in bit order.
+        '''
+        # The seed is written at exit; one that does not fit the header must fail before the session instead.
+        if not 0 <= seed < 2 ** 64:
+            raise ValueError(f'a recorded seed must be between 0 and {2 ** 64 - 1}, not {seed}')
+        self.path = path
+        self.seed = seed
+        self.storm_meteors = storm_meteors
+        self.time_scale = time_scale
+        self.actions = actions
+        self.frames = bytearray()
+
+    def record(self, delta_time, held):
+        '''
+        Appends a frame.
+
+        Parameters:
+        - delta_time: The frame's delta time, in seconds;
+        - held: The bitmask of the actions held during the frame.
+        '''
+        self.frames += FRAME.pack(delta_time, held)
+
+    def close(self):
+        '''
+        Writes the replay file.
+        '''
+        actions = ','.join(self.actions).encode('utf-8')
+        with open(self.path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, self.seed, self.storm_meteors, self.time_scale, len(actions)))
+            file.write(actions)
+            file.write(zlib.compress(bytes(self.frames), 9))
+
+class Replay():
+    '''
+    Plays back the inputs and delta times recorded by Recorder.
+    '''
+    def __init__(self, path):
+        '''
+        Initializes the Replay class, reading the whole file.
+
+        Parameters:
+        - path: The path of the replay file.
+
+        Attributes:
+        - seed: The random seed of the recorded session;
+        - storm_meteors: The meteor storm size of the recorded session;
+        - time_scale: The game clock scale of the recorded session;
+        - actions: The input action names of the recording, in bit order;
+        - frames: The recorded (delta time, held actions) pairs;
+        - position: Index of the next frame to play.
+        '''
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic = data[:len(MAGIC)]
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a replay file, or was recorded by an older version')
+        magic, self.seed, self.storm_meteors, self.time_scale, length = HEADER.unpack_from(data)
+        if not math.isfinite(self.time_scale) or self.time_scale <= 0:
+            raise ValueError(f'{path} has an invalid time scale')
+        start = HEADER.size + length
+        self.actions = data[HEADER.size:start].decode('utf-8').split(',')
+        self.frames = list(FRAME.iter_unpack(zlib.decompress(data[start:])))
+        if not self.frames:
+            # Playback reads a frame before it can check for the end, so a replay needs at least one.
+            raise ValueError(f'{path} has no recorded frames')
+        self.position = 0
+
+    def remap(self, actions):
+        '''
+        Renumbers the recorded action bits for the current action order, dropping actions that no longer exist.
+
+        Parameters:
+        - actions: The current input action names, in bit order.
+        '''
+        bits = [(1 << index, 1 << actions.index(action)) for index, action in enumerate(self.actions) if action in actions]
+        self.frames = [(delta_time, sum(new for old, new in bits if held & old)) for delta_time, held in self.frames]
+        self.actions = list(actions)
+
+    def next_frame(self):
+        '''
+        Returns the next recorded frame as a (delta time, held actions) pair.
+        '''
+        frame = self.frames[self.position]
+        self.position += 1
+        return frame
+
+    def finished(self):
+        '''
+        Whether every recorded frame was played.
+        '''
+        return self.position >= len(self.frames)
@@ -0,0 +1,57 @@
+import heapq
+import itertools
+
+class Scheduler():
+    '''
+    Runs callbacks at given points of simulation time, kept in a priority queue ordered by due time.
+    Events due at the same time run in the order they were scheduled.
+    '''
+    def __init__(self):
+        '''
+        Initializes the Scheduler class.
+
+        Attributes:
+        - time: Simulation time elapsed, in seconds;
+        - current: Due time of the event being run, so recurring events can schedule their next run without drift;
+        - queue: Heap of (due time, order, callback, arguments) entries.
+        '''
+        self.time = 0
+        self.current = 0
+        self.queue = []
+        self.order = itertools.count()
+
+    def schedule_at(self, time, callback, *args):
+        '''
+        Schedules a callback at an absolute simulation time.
+
+        Parameters:
+        - time: Due time in seconds;
+        - callback: The function to call;
+        - args: Arguments of the callback.
+        '''
+        heapq.heappush(self.queue, (time, next(self.order), callback, args))
+
+    def schedule(self, delay, callback, *args):
+        '''
+        Schedules a callback after a delay, counted from the event being run (or from the current time outside events).
+
+        Parameters:
+        - delay: Delay in seconds;
+        - callback: The function to call;
+        - args: Arguments of the callback.
+        '''
+        self.schedule_at(self.current + delay, callback, *args)
+
+    def advance(self, delta_time):
+        '''
+        Moves time forward and runs every event that became due, in due time order,
+        including the ones the callbacks schedule within the step.
+
+        Parameters:
+        - delta_time: Duration of the simulation step, in seconds.
+        '''
+        self.time += delta_time
+        while self.queue and self.queue[0][0] <= self.time:
+            self.current, _, callback, args = heapq.heappop(self.queue)
+            callback(*args)
+        self.current = self.time
@@ -1,4 +1,6 @@
+import math
 import pygame
+from scripts.basics.clock import GameClock
 
 class Screen():
     '''
@@ -15,7 +17,9 @@ class Screen():
         - WIDTH: Default screen width (used as a reference for scaling);
         - HEIGHT: Default screen height (used as a reference for scaling);
         - display_surf: The main display surface for rendering;
-        - clock: A Pygame clock object for managing frame timing.
+        - clock: A Pygame clock object for managing frame timing;
+        - game_clock: The game time, advanced by the active scene and read by gameplay timers and widgets;
+        - resize_listeners: Functions called after the display is recreated, so scenes can recreate their canvases.
         '''
         self.settings = settings
         # Default reference dimensions for screen scaling.
@@ -25,6 +29,13 @@ class Screen():
         self.set_screen(self.settings.video_settings['width'], self.settings.video_settings['height'], self.settings.video_settings['vsync'])
         # Clock to manage frame timing.
         self.clock = pygame.time.Clock()
+        # Scaled, pausable game time.
+        self.game_clock = GameClock()
+        # Fixed delta time in seconds, used instead of the measured frame time when set.
+        self.fixed_dt = None
+        # Display areas to refresh on the next update, or None to refresh the whole window.
+        self.update_rects = None
+        self.resize_listeners = []
 
     def set_screen(self, width, height, vsync):
         '''
@@ -37,28 +48,125 @@ class Screen():
 
         Sets:
         - display_surf: The main Pygame display surface;
-        - width_ratio: The ratio between the current width and the default width;
-        - height_ratio: The ratio between the current height and the default height;
-        - aspect_ratio: A tuple containing the width and height scaling ratios.
+        - scale_mode: How the canvas is scaled to the display ('native', 'integer', 'nearest' or 'smooth');
+        - viewport: The area of the display covered by the canvas;
+        - width_ratio: The ratio between the viewport width and the default width;
+        - height_ratio: The ratio between the viewport height and the default height;
+        - aspect_ratio: A tuple containing the width and height scaling ratios;
+        - offset: The top-left corner of the viewport, non-zero when letterboxed.
         '''
         self.display_surf = pygame.display.set_mode((width, height), vsync=vsync)
+        self.scale_mode = self.choose_scale_mode(width, height, self.settings.video_settings['scale_mode'])
+        if self.scale_mode == 'integer':
+            # Largest whole multiple of the canvas that fits, centered with black borders.
+            factor = min(width // self.WIDTH, height // self.HEIGHT)
+            self.viewport = pygame.Rect(0, 0, self.WIDTH * factor, self.HEIGHT * factor)
+            self.viewport.center = (width // 2, height // 2)
+        else:
+            self.viewport = self.display_surf.get_rect()
+        self.display_surf.fill((0, 0, 0))
+        # Surface the canvas is scaled into, and the scaling function (None when the canvas is copied as is).
+        self.viewport_surf = self.display_surf.subsurface(self.viewport)
+        if self.viewport.size == (self.WIDTH, self.HEIGHT):
+            self.scale_function = None
+        elif self.scale_mode == 'smooth':
+            self.scale_function = pygame.transform.smoothscale
+        else:
+            self.scale_function = pygame.transform.scale
         # Calculate scaling ratios based on the default dimensions.
-        self.width_ratio = width / self.WIDTH
-        self.height_ratio = height / self.HEIGHT
+        self.width_ratio = self.viewport.width / self.WIDTH
+        self.height_ratio = self.viewport.height / self.HEIGHT
         self.aspect_ratio = (self.width_ratio, self.height_ratio)
+        self.offset = self.viewport.topleft
         # Set the window title.
         pygame.display.set_caption(self.settings.game_texts['title'])
-        
+
+    def choose_scale_mode(self, width, height, mode):
+        '''
+        Picks the cheapest scaling mode that works for a resolution.
+
+        Parameters:
+        - width: The screen width;
+        - height: The screen height;
+        - mode: The requested mode: 'auto', 'native', 'integer', 'nearest' or 'smooth'.
+
+        Returns:
+        - The mode to use. 'auto' renders natively at the default size, uses integer scaling
+        for exact multiples of it and smooth scaling otherwise. Modes that cannot apply
+        (native at another size, integer below the default size) fall back to 'auto'.
+        '''
+        native = (width, height) == (self.WIDTH, self.HEIGHT)
+        fits = width >= self.WIDTH and height >= self.HEIGHT
+        if mode == 'native' and native or mode == 'integer' and fits or mode in ('nearest', 'smooth'):
+            return mode
+        if native:
+            return 'native'
+        if fits and width % self.WIDTH == 0 and height % self.HEIGHT == 0 and width // self.WIDTH == height // self.HEIGHT:
+            return 'integer'
+        return 'smooth'
+
+    def create_canvas(self):
+        '''
+        Creates the surface the game draws on.
+
+        Returns:
+        - The display surface itself in native mode, so nothing has to be scaled or copied,
+        otherwise a new surface with the default dimensions.
+        '''
+        if self.scale_mode == 'native':
+            return self.display_surf
+        return pygame.Surface((self.WIDTH, self.HEIGHT))
     
     def scale_screen(self, screen):
         '''
-        Scales the provided surface to fit the display surface.
+        Scales the provided surface to fit the display surface, using the current scale mode.
 
         Parameters:
         - screen: The surface to scale.
         '''
-        pygame.transform.smoothscale(screen, self.display_surf.get_size(), self.display_surf)
+        if screen is self.display_surf:
+            return
+        if self.scale_function is None:
+            self.viewport_surf.blit(screen, (0, 0))
+        else:
+            self.scale_function(screen, self.viewport.size, self.viewport_surf)
     
+    def present(self, screen, rects):
+        '''
+        Copies only the changed areas of a surface to the display, scaling them when needed,
+        and limits the next display update to those areas.
+
+        Parameters:
+        - screen: The surface to copy from (usually the game canvas);
+        - rects: The changed areas, in the surface's coordinates.
+        '''
+        bounds = screen.get_rect()
+        self.update_rects = []
+        for rect in rects:
+            # Grow each area by a pixel to cover rounding of fractional sprite positions.
+            rect = pygame.Rect(rect).inflate(2, 2).clip(bounds)
+            if not rect:
+                continue
+            if screen is self.display_surf:
+                # Native mode: the canvas already is the display.
+                self.update_rects.append(rect)
+            elif self.scale_function is None:
+                self.update_rects.append(self.display_surf.blit(screen, rect.move(self.offset), rect))
+            else:
+                left = int(rect.left * self.width_ratio)
+                top = int(rect.top * self.height_ratio)
+                target = pygame.Rect(left, top, math.ceil(rect.right * self.width_ratio) - left, math.ceil(rect.bottom * self.height_ratio) - top)
+                self.update_rects.append(self.display_surf.blit(self.scale_function(screen.subsurface(rect), target.size), target.move(self.offset)))
+
+    def on_resize(self, listener):
+        '''
+        Registers a function to call after the display is recreated by resize_screen().
+
+        Parameters:
+        - listener: A function without arguments.
+        '''
+        self.resize_listeners.append(listener)
+
     def resize_screen(self, width, height, vsync):
         '''
         Resizes the game screen and updates the video settings.
@@ -70,7 +178,8 @@ class Screen():
 
         Steps:
         - Updates the video settings in the Settings instance;
-        - Quits the current display and sets up a new one with the updated settings.
+        - Quits the current display and sets up a new one with the updated settings;
+        - Notifies the resize listeners, since canvases may refer to the old display surface.
         '''
         # Update the video settings stored in the Settings object.
         self.settings.set_settings('video', 'width', width)
@@ -80,18 +189,31 @@ class Screen():
         pygame.display.quit()
         pygame.mixer.quit()
         self.set_screen(width, height, vsync)
+        for listener in self.resize_listeners:
+            listener()
     
     def delta_time(self):
         '''
         Calculates the time since the last frame.
 
         Sets:
-        - dt: Delta time in seconds, based on the desired frames per second (fps) from the settings.
+        - dt: Delta time in seconds, based on the desired frames per second (fps) from the settings,
+        or the fixed delta time without waiting when one is set.
         '''
-        self.dt = self.clock.tick(self.settings.video_settings['fps']) / 1000
+        if self.fixed_dt is not None:
+            # Keep the clock measuring real frame times, but never sleep.
+            self.clock.tick()
+            self.dt = self.fixed_dt
+        else:
+            self.dt = self.clock.tick(self.settings.video_settings['fps']) / 1000
     
     def screen_update(self):
         '''
-        Updates the entire display window, rendering any changes.
+        Updates the display window, rendering any changes.
+        Only the areas given to present() are refreshed when it was called this frame.
         '''
-        pygame.display.update()
+        if self.update_rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(self.update_rects)
+            self.update_rects = None
@@ -1,5 +1,9 @@
 import json
 import os
+import shutil
+import tempfile
+import threading
+import time
 
 class Settings():
     '''
@@ -22,6 +26,17 @@ class Settings():
         self.settings = self.load_settings()
         # Initialize game-specific settings.
         self.game_settings()
+        # Incremented on every change, so other systems can notice new settings cheaply.
+        self.version = 0
+        # Background persistence: changes mark the settings dirty and are written
+        # once no new change arrived for write_delay seconds.
+        self.write_delay = 0.5
+        self.dirty = False
+        self.last_change = 0
+        self.closing = False
+        self.condition = threading.Condition()
+        self.writer = threading.Thread(target=self.writer_loop, name='settings-writer', daemon=True)
+        self.writer.start()
     
     def load_settings(self):
         '''
@@ -43,7 +58,10 @@ class Settings():
         - Language settings;
         - Game text based on the selected language;
         - Game data;
-        - Controls.
+        - Controls (keyboard and gamepad);
+        - Meteor spawning;
+        - Culling of off-screen and expired entities;
+        - Performance tuning.
         '''
         # Load specific categories of settings.
         # Video-related settings.
@@ -59,18 +77,72 @@ class Settings():
         # Load other game-related settings.
         self.game_data = self.get_settings('game_data')
         self.controls = self.get_settings('keys')
+        self.gamepad_controls = self.get_settings('gamepad')
+        self.spawn_settings = self.get_settings('spawning')
+        self.culling_settings = self.get_settings('culling')
+        # Performance tuning settings.
+        self.performance_settings = self.get_settings('performance')
     
     def update_settings(self):
         '''
-        Updates the JSON file with the current settings in memory.
-        Also reinitializes the game settings after updating the file.
+        Marks the settings in memory as changed and reinitializes the game settings.
+        The JSON file is written later by the background writer, coalescing bursts of changes.
         '''
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            # Write the current settings dictionary to the file with indentation.
-            json.dump(self.settings, file, indent=4, ensure_ascii=False)
+        with self.condition:
+            self.dirty = True
+            self.last_change = time.monotonic()
+            self.version += 1
+            self.condition.notify()
         # Reinitialize game settings to reflect the updated values.
         self.game_settings()
 
+    def save_settings(self, data):
+        '''
+        Writes settings to the JSON file atomically: to a temporary file first, then renamed over the old one,
+        so a crash mid-write never leaves a truncated file.
+
+        Parameters:
+        - data: The settings serialized as a JSON string.
+        '''
+        directory = os.path.dirname(self.file_path)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False) as file:
+            file.write(data)
+        # Keep the permissions of the file being replaced.
+        shutil.copymode(self.file_path, file.name)
+        os.replace(file.name, self.file_path)
+
+    def writer_loop(self):
+        '''
+        Background thread that writes dirty settings once they stop changing for write_delay seconds.
+        '''
+        while True:
+            with self.condition:
+                while not self.dirty and not self.closing:
+                    self.condition.wait()
+                if self.closing:
+                    return
+                # Debounce: keep waiting while changes keep arriving.
+                remaining = self.last_change + self.write_delay - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+                # Serialize under the lock, so the snapshot is consistent.
+                data = json.dumps(self.settings, indent=4, ensure_ascii=False)
+                self.dirty = False
+            self.save_settings(data)
+
+    def flush(self):
+        '''
+        Stops the background writer and writes any pending change immediately. Called on shutdown.
+        '''
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.writer.join()
+        if self.dirty:
+            self.dirty = False
+            self.save_settings(json.dumps(self.settings, indent=4, ensure_ascii=False))
+
     def get_settings(self, key):
         '''
         Retrieves a specific setting value by its key.
@@ -85,14 +157,18 @@ class Settings():
     
     def set_settings(self, option, key, value):
         '''
-        Updates a specific setting value and saves the changes to the JSON file.
+        Updates a specific setting value and schedules saving the changes to the JSON file.
 
         Parameters:
         - option: The top-level category in the settings dictionary;
         - key: The specific key within the category to update;
         - value: The new value to set for the key.
         '''
+        # Nothing to do if the value did not change (e.g. a slider held still).
+        if self.settings[option].get(key) == value:
+            return
         # Update the value of the specified key in the settings dictionary.
-        self.settings[option][key] = value
-        # Save the updated settings to the JSON file.
+        with self.condition:
+            self.settings[option][key] = value
+        # Schedule saving the updated settings to the JSON file.
         self.update_settings()
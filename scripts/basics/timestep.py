@@ -0,0 +1,52 @@
+import math
+
+class FixedTimestep():
+    '''
+    Splits variable frame times into fixed simulation steps, using an accumulator.
+    '''
+    def __init__(self, tick_rate=60, max_steps=5):
+        '''
+        Initializes the FixedTimestep class.
+
+        Parameters:
+        - tick_rate: Simulation steps per second (0 runs one variable step per frame, like before);
+        - max_steps: Maximum number of steps simulated in a single frame, so a long hitch
+        drops time instead of stalling the game while it catches up.
+
+        Attributes:
+        - step: Duration of one simulation step in seconds;
+        - accumulator: Frame time not yet simulated, in seconds;
+        - alpha: How far the display is between the last two simulation states (0 to 1).
+        '''
+        self.tick_rate = tick_rate
+        self.max_steps = max_steps
+        self.step = 1 / tick_rate if tick_rate else 0
+        self.accumulator = 0
+        self.alpha = 1
+
+    def advance(self, frame_time, scale=1):
+        '''
+        Adds a frame's time to the accumulator and finds how many steps to simulate.
+
+        Parameters:
+        - frame_time: Game time elapsed since the last frame, in seconds;
+        - scale: Positive game time speed factor; faster games may catch up proportionally more steps per frame.
+
+        Returns:
+        - The number of steps of length step to simulate this frame.
+        '''
+        if not self.tick_rate:
+            # Variable timestep: one step lasting the whole frame.
+            self.step = frame_time
+            self.alpha = 1
+            return 1
+        self.accumulator += frame_time
+        # The small tolerance keeps float rounding from skipping a step when frame and tick rates match.
+        steps = int((self.accumulator + 1e-9) / self.step)
+        max_steps = self.max_steps * math.ceil(scale)
+        if steps > max_steps:
+            steps = max_steps
+            self.accumulator = self.step * steps
+        self.accumulator = max(self.accumulator - self.step * steps, 0)
+        self.alpha = min(self.accumulator / self.step, 1)
+        return steps
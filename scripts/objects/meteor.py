@@ -1,24 +1,41 @@
 import pygame
 import random
+from scripts.basics.pool import PooledSprite
+
+class Meteor(PooledSprite):
+    # Drawn below every other sprite.
+    layer = 0
+    # Lifetime setting used by the culling pass.
+    kind = 'meteor'
 
-class Meteor(pygame.sprite.Sprite):
     def __init__(self, game, image, groups):
         super().__init__(groups)
         self.game = game
-        self.original_image = image
-        self.image = self.original_image
-        self.rect = self.image.get_frect(midbottom=(random.randint(0, self.game.screen.WIDTH), 0))
+        self.rect = pygame.FRect()
+        self.direction = pygame.Vector2()
+        self.velocity = pygame.Vector2()
+        self.reset(image)
+
+    def reset(self, image):
+        # Pre-rotated frames from the assets rotation cache.
+        self.frames = image
+        self.image = self.frames[0]
+        self.mask = self.game.assets.masks[self.image]
+        self.rect.size = self.image.get_size()
+        self.rect.midbottom = (random.randint(0, self.game.screen.WIDTH), 0)
         self.speed = random.randint(50, 300)
-        self.direction = pygame.Vector2(random.uniform(-0.5, 0.5), 1)
-        self.creation_time = pygame.time.get_ticks()
+        self.direction.update(random.uniform(-0.5, 0.5), 1)
+        self.velocity.update(self.direction * self.speed)
+        self.creation_time = self.game.screen.game_clock.get_ticks()
         self.rotation = 0
         self.rotation_speed = random.randint(-100, -50) if random.randint(0,1) == 0 else random.randint(50, 100)
     
     def update(self, delta_time):
-        self.direction.normalize()
-        self.rect.center += self.speed * self.direction * delta_time
-        if self.rect.top >= self.game.screen.HEIGHT:
-            self.kill()
+        self.rect.center += self.velocity * delta_time
         self.rotation += self.rotation_speed * delta_time
-        self.image = pygame.transform.rotozoom(self.original_image, self.rotation, 1)
-        self.rect = self.image.get_frect(center = self.rect.center)
+        # Pick the cached frame closest to the current angle instead of resampling the image.
+        self.image = self.frames[round(self.rotation * len(self.frames) / 360) % len(self.frames)]
+        self.mask = self.game.assets.masks[self.image]
+        center = self.rect.center
+        self.rect.size = self.image.get_size()
+        self.rect.center = center
@@ -0,0 +1,118 @@
+import numpy as np
+from scripts.basics.arrays import ArraySystem
+
+class MeteorField(ArraySystem):
+    '''
+    Structure-of-arrays meteor engine: positions, velocities and rotations live in NumPy arrays
+    and are updated, culled and drawn in bulk, for meteor counts far beyond what per-sprite updates handle.
+    '''
+    # Drawn in the same layer as meteor sprites.
+    layer = 0
+
+    def __init__(self, game, frames, capacity=5000):
+        '''
+        Initializes the MeteorField class.
+
+        Parameters:
+        - game: The game instance;
+        - frames: Pre-rotated meteor frames from the assets rotation cache;
+        - capacity: Maximum number of meteors alive at once.
+
+        Attributes:
+        - positions: Meteor centers, shape (capacity, 2);
+        - velocities: Meteor velocities in pixels per second, shape (capacity, 2);
+        - rotations: Meteor angles in degrees;
+        - rotation_speeds: Meteor angular speeds in degrees per second;
+        - creation_times: Game clock time at which each meteor spawned, in seconds.
+        '''
+        super().__init__(capacity)
+        self.game = game
+        self.frames = frames
+        self.masks = [self.game.assets.masks[frame] for frame in frames]
+        self.half_sizes = np.array([frame.get_size() for frame in frames], dtype=np.float32) / 2
+        self.positions = self.array((2,))
+        self.velocities = self.array((2,))
+        self.rotations = self.array()
+        self.rotation_speeds = self.array()
+        self.creation_times = self.array(dtype=np.float64)
+
+    def spawn(self, amount, spread=0):
+        '''
+        Spawns meteors above the top of the screen, with the same random ranges as Meteor.
+
+        Parameters:
+        - amount: Number of meteors to spawn, limited by the free capacity;
+        - spread: Extra height above the screen over which the meteors are scattered.
+        '''
+        amount = min(amount, self.capacity - self.count)
+        if amount <= 0:
+            return
+        new = slice(self.count, self.count + amount)
+        self.rotations[new] = 0
+        self.creation_times[new] = self.game.screen.game_clock.time
+        self.positions[new, 0] = self.rng.integers(0, self.game.screen.WIDTH, amount, endpoint=True)
+        self.positions[new, 1] = -self.half_sizes[0, 1] - self.rng.uniform(0, spread, amount)
+        speeds = self.rng.integers(50, 300, amount, endpoint=True)
+        self.velocities[new, 0] = self.rng.uniform(-0.5, 0.5, amount) * speeds
+        self.velocities[new, 1] = speeds
+        directions = np.where(self.rng.integers(0, 1, amount, endpoint=True) == 0, -1, 1)
+        self.rotation_speeds[new] = directions * self.rng.integers(50, 100, amount, endpoint=True)
+        self.count += amount
+
+    def frame_indices(self):
+        '''
+        Returns the cached rotation frame of every live meteor.
+        '''
+        steps = len(self.frames)
+        return np.rint(self.rotations[:self.count] * steps / 360).astype(np.intp) % steps
+
+    def update(self, delta_time):
+        '''
+        Moves and rotates every meteor in one vectorized step. Meteors that left the screen are dropped by the culling pass.
+
+        Parameters:
+        - delta_time: Time elapsed since the last update, in seconds.
+        '''
+        live = slice(0, self.count)
+        self.positions[live] += self.velocities[live] * delta_time
+        self.rotations[live] += self.rotation_speeds[live] * delta_time
+
+    def collide(self, sprite):
+        '''
+        Finds the meteors touching a sprite: a vectorized bounding box test, then mask tests for the candidates.
+
+        Parameters:
+        - sprite: A sprite with rect and mask attributes.
+
+        Returns:
+        - A list of indices of the colliding meteors.
+        '''
+        indices = self.frame_indices()
+        half_sizes = self.half_sizes[indices]
+        rect = sprite.rect
+        offsets = self.positions[:self.count] - half_sizes
+        candidates = np.flatnonzero((np.abs(self.positions[:self.count, 0] - rect.centerx) < half_sizes[:, 0] + rect.width / 2) & (np.abs(self.positions[:self.count, 1] - rect.centery) < half_sizes[:, 1] + rect.height / 2))
+        hits = []
+        for index in candidates.tolist():
+            offset = (int(offsets[index, 0] - rect.left), int(offsets[index, 1] - rect.top))
+            if sprite.mask.overlap(self.masks[indices[index]], offset):
+                hits.append(index)
+        return hits
+
+    def draw(self, renderer, time_offset=0):
+        '''
+        Queues every visible meteor in the renderer, as one batch of blits.
+
+        Parameters:
+        - renderer: The Renderer collecting the frame's draw commands;
+        - time_offset: Seconds to move the meteors along their velocity when drawing,
+        negative to interpolate back towards the previous simulation state.
+        '''
+        indices = self.frame_indices()
+        topleft = self.positions[:self.count] + self.velocities[:self.count] * time_offset - self.half_sizes[indices]
+        # Meteors waiting above the top edge, or in the culling margin around the view, are skipped before building the blit list.
+        bottomright = topleft + self.half_sizes[indices] * 2
+        screen = self.game.screen
+        visible = np.flatnonzero((bottomright[:, 0] > 0) & (bottomright[:, 1] > 0) & (topleft[:, 0] < screen.WIDTH) & (topleft[:, 1] < screen.HEIGHT))
+        frames = self.frames
+        renderer.submit_batch([(frames[index], position) for index, position in zip(indices[visible].tolist(), topleft[visible].tolist())], self.layer)
@@ -0,0 +1,197 @@
+import math
+import numpy as np
+import pygame
+from scripts.basics.arrays import ArraySystem
+
+class ParticleSystem(ArraySystem):
+    '''
+    Structure-of-arrays particle engine for visual effects (explosions, debris, sparks, thruster trails).
+    Particles have no collisions: they move, age and die in bulk, and are drawn as one batch of blits.
+    '''
+    # Drawn above meteors and lasers, below the ship.
+    layer = 2
+
+    def __init__(self, game, explosion_frames, budget=2000):
+        '''
+        Initializes the ParticleSystem class, building the frames of every effect.
+
+        Parameters:
+        - game: The game instance;
+        - explosion_frames: The explosion animation frames from the assets;
+        - budget: Maximum number of live particles; emissions beyond it are dropped.
+
+        Attributes:
+        - effects: List of effects; each particle's frame is picked by how far it is through its life;
+        - positions: Particle centers, shape (budget, 2);
+        - velocities: Particle velocities in pixels per second, shape (budget, 2);
+        - ages: Time lived, in seconds;
+        - lifetimes: Time each particle lives, in seconds;
+        - kinds: Index of each particle's effect;
+        - dropped: Number of particles not emitted because the budget was full.
+        '''
+        super().__init__(budget)
+        self.game = game
+        self.effects = [
+            # The explosion sheet, played once at its original 50 frames per second.
+            {'name': 'explosion', 'frames': explosion_frames, 'drag': 0},
+            # Glowing sparks cooling from yellow to dark red.
+            {'name': 'sparks', 'frames': self.fade_frames([(255,240,150), (255,190,60), (240,110,30), (150,40,20)], 3, 1), 'drag': 2.5},
+            # Rock debris shrinking as it burns up.
+            {'name': 'debris', 'frames': self.fade_frames([(160,130,110), (120,95,80), (80,60,50)], 4, 2), 'drag': 1},
+            # Engine exhaust fading from white-blue to transparent.
+            {'name': 'thruster', 'frames': self.fade_frames([(220,240,255), (120,180,255), (60,90,200), (30,40,120)], 4, 1), 'drag': 0},
+        ]
+        self.kind = {effect['name']: index for index, effect in enumerate(self.effects)}
+        self.drags = np.array([effect['drag'] for effect in self.effects], dtype=np.float32)
+        self.positions = self.array((2,))
+        self.velocities = self.array((2,))
+        self.ages = self.array()
+        self.lifetimes = self.array(fill=1)
+        self.kinds = self.array(dtype=np.uint8)
+        self.dropped = 0
+
+    def fade_frames(self, colors, radius, min_radius):
+        '''
+        Builds the frames of a round particle that shrinks and fades through a list of colors.
+
+        Parameters:
+        - colors: Colors from birth to death;
+        - radius: Radius at birth, in pixels;
+        - min_radius: Radius at death, in pixels.
+
+        Returns:
+        - A list of surfaces.
+        '''
+        frames = []
+        steps = len(colors)
+        for index, color in enumerate(colors):
+            progress = index / max(steps - 1, 1)
+            size = round(radius + (min_radius - radius) * progress)
+            frame = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(frame, (*color, round(255 - 180 * progress)), (size, size), size)
+            frames.append(frame.convert_alpha())
+        return frames
+
+    def emit(self, name, position, amount, speed=(0, 0), lifetime=(1, 1), direction=None, spread=math.tau, velocity=(0, 0)):
+        '''
+        Emits particles from a point, dropping what does not fit in the budget.
+
+        Parameters:
+        - name: The effect name;
+        - position: Center of the emission;
+        - amount: Number of particles;
+        - speed: Range (min, max) of particle speeds, in pixels per second;
+        - lifetime: Range (min, max) of particle lifetimes, in seconds;
+        - direction: Angle in radians the particles are thrown towards (None for every direction);
+        - spread: Width of the cone of directions around direction, in radians;
+        - velocity: Velocity added to every particle, e.g. the emitter's own.
+        '''
+        fitting = min(amount, self.capacity - self.count)
+        self.dropped += amount - fitting
+        if fitting <= 0:
+            return
+        new = slice(self.count, self.count + fitting)
+        angles = self.rng.uniform(-spread / 2, spread / 2, fitting) + (direction or 0)
+        speeds = self.rng.uniform(speed[0], speed[1], fitting)
+        self.positions[new] = position
+        self.velocities[new, 0] = np.cos(angles) * speeds + velocity[0]
+        self.velocities[new, 1] = np.sin(angles) * speeds + velocity[1]
+        self.ages[new] = 0
+        self.lifetimes[new] = self.rng.uniform(lifetime[0], lifetime[1], fitting)
+        self.kinds[new] = self.kind[name]
+        self.count += fitting
+
+    def explode(self, position):
+        '''
+        Emits an explosion: the animated blast, with sparks and debris thrown around it.
+
+        Parameters:
+        - position: Center of the explosion.
+        '''
+        frames = len(self.effects[self.kind['explosion']]['frames'])
+        self.emit('explosion', position, 1, lifetime=(frames / 50, frames / 50))
+        self.emit('sparks', position, 24, speed=(150, 420), lifetime=(0.25, 0.6))
+        self.emit('debris', position, 10, speed=(40, 160), lifetime=(0.5, 1.1))
+
+    def update(self, delta_time):
+        '''
+        Moves and ages every particle in one vectorized step, slowing them by their effect's drag,
+        then drops the particles that died.
+
+        Parameters:
+        - delta_time: Time elapsed since the last update, in seconds.
+        '''
+        live = slice(0, self.count)
+        self.velocities[live] *= np.maximum(1 - self.drags[self.kinds[live]] * delta_time, 0)[:, None]
+        self.positions[live] += self.velocities[live] * delta_time
+        self.ages[live] += delta_time
+        self.keep(self.ages[live] < self.lifetimes[live])
+
+    def draw(self, renderer, time_offset=0):
+        '''
+        Queues the particles in the renderer, as one batch of blits.
+
+        Parameters:
+        - renderer: The Renderer collecting the frame's draw commands;
+        - time_offset: Seconds to move the particles along their velocity when drawing,
+        negative to interpolate back towards the previous simulation state.
+
+        Returns:
+        - The area covered by the particles, or None when there are none.
+        '''
+        if not self.count:
+            return None
+        live = slice(0, self.count)
+        positions = self.positions[live] + self.velocities[live] * time_offset
+        progress = np.minimum(self.ages[live] / self.lifetimes[live], 0.999)
+        kinds = self.kinds[live]
+        commands = []
+        area = None
+        for kind in np.unique(kinds).tolist():
+            frames = self.effects[kind]['frames']
+            selected = np.flatnonzero(kinds == kind)
+            indices = (progress[selected] * len(frames)).astype(np.intp)
+            half_size = frames[0].get_width() / 2, frames[0].get_height() / 2
+            topleft = positions[selected] - half_size
+            commands.extend([(frames[index], position) for index, position in zip(indices.tolist(), topleft.tolist())])
+            low = topleft.min(axis=0)
+            high = topleft.max(axis=0) + (half_size[0] * 2, half_size[1] * 2)
+            rect = pygame.Rect(int(low[0]), int(low[1]), int(high[0] - low[0]) + 2, int(high[1] - low[1]) + 2)
+            area = rect if area is None else area.union(rect)
+        renderer.submit_batch(commands, self.layer)
+        return area
+
+class Emitter():
+    '''
+    Continuous particle source, emitting at a steady rate whatever the step length.
+    '''
+    def __init__(self, particles, name, rate, **emission):
+        '''
+        Initializes the Emitter class.
+
+        Parameters:
+        - particles: The ParticleSystem receiving the particles;
+        - name: The effect name;
+        - rate: Particles per second;
+        - emission: Other arguments of ParticleSystem.emit (speed, lifetime, direction, spread).
+        '''
+        self.particles = particles
+        self.name = name
+        self.rate = rate
+        self.emission = emission
+        self.pending = 0
+
+    def update(self, delta_time, position, velocity=(0, 0)):
+        '''
+        Emits the particles due during a step.
+
+        Parameters:
+        - delta_time: Duration of the step, in seconds;
+        - position: Position of the source;
+        - velocity: Velocity of the source, partly passed on to the particles.
+        '''
+        self.pending += self.rate * delta_time
+        amount = int(self.pending)
+        if amount:
+            self.pending -= amount
+            self.particles.emit(self.name, position, amount, velocity=(velocity[0] * 0.3, velocity[1] * 0.3), **self.emission)
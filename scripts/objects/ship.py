@@ -1,28 +1,38 @@
+import math
 import pygame
+from scripts.basics.pool import PooledSprite
+from scripts.objects.particles import Emitter
 
 class Ship(pygame.sprite.Sprite):
+    # Drawn above everything else.
+    layer = 3
+
     def __init__(self, game, image, groups):
         super().__init__(groups)
         self.game = game
         self.image = image
+        self.mask = self.game.assets.masks[self.image]
         self.rect = self.image.get_frect(center = (self.game.screen.WIDTH/2, self.game.screen.HEIGHT/2))
+        self.previous_center = None
         self.direction = pygame.Vector2()
         self.speed = 300
         self.shoot = True
         self.shoot_time = 0
         self.shoot_duration = 400
         self.meteors_destroyed = 0
+        # Exhaust trail streaming down from the engine.
+        self.thruster = Emitter(self.game.particles, 'thruster', 90, speed=(120, 200), lifetime=(0.2, 0.4), direction=math.pi/2, spread=0.5)
     
     def shoot_timer(self):
         if not self.shoot:
-            current_time = pygame.time.get_ticks()
+            current_time = self.game.screen.game_clock.get_ticks()
             if (current_time - self.shoot_time) >= self.shoot_duration:
                 self.shoot = True
     
     def update(self, delta_time):
-        keys = pygame.key.get_pressed()
-        self.direction.x = int(keys[pygame.key.key_code(self.game.settings.controls['right'])]) - int(keys[pygame.key.key_code(self.game.settings.controls['left'])])
-        self.direction.y = int(keys[pygame.key.key_code(self.game.settings.controls['down'])]) - int(keys[pygame.key.key_code(self.game.settings.controls['up'])])
+        controls = self.game.input
+        self.direction.x = controls.axis('left', 'right')
+        self.direction.y = controls.axis('up', 'down')
         self.direction = self.direction.normalize() if self.direction else self.direction
         self.rect.center += self.direction * self.speed * delta_time
         
@@ -35,46 +45,35 @@ class Ship(pygame.sprite.Sprite):
         if self.rect.right >= self.game.screen.WIDTH:
             self.rect.right = self.game.screen.WIDTH
         
-        recent_keys = pygame.key.get_just_pressed()
-        if recent_keys[pygame.key.key_code(self.game.settings.controls['shoot'])] and self.shoot:
-            Laser(self.game, self.game.assets.laser_surf, (self.game.assets.all_sprites, self.game.assets.laser_sprites), self.rect.midtop)
-            self.game.assets.laser_sound.play()
-            self.shoot_time = pygame.time.get_ticks()
+        if controls.is_pressed('shoot') and self.shoot:
+            self.game.assets.pools['laser'].acquire(self.game, self.game.assets.laser_surf, self.rect.midtop)
+            self.game.assets.play('laser_sound')
+            self.shoot_time = self.game.screen.game_clock.get_ticks()
             self.shoot = False
         
         self.shoot_timer()
+        self.thruster.update(delta_time, self.rect.midbottom, self.direction * self.speed)
+
+class Laser(PooledSprite):
+    # Drawn above meteors.
+    layer = 1
+    # Lifetime setting used by the culling pass.
+    kind = 'laser'
 
-class Laser(pygame.sprite.Sprite):
     def __init__(self, game, image, groups, ship_pos):
         super().__init__(groups)
         self.game = game
-        self.image = image
-        self.rect = self.image.get_frect(midbottom = (ship_pos[0], ship_pos[1]))
+        self.rect = pygame.FRect()
         self.speed = 500
-    
-    def update(self, delta_time):
-        self.rect.y -= self.speed * delta_time
-        
-        if self.rect.bottom <= 0:
-            self.kill()
-        
-        if pygame.sprite.groupcollide(self.game.assets.laser_sprites, self.game.assets.meteor_sprites, True, True, pygame.sprite.collide_mask):
-            Explosion(self.game, self.game.assets.explosion_surf, self.game.assets.all_sprites, self.rect.midtop)
-            self.game.assets.explosion_sound.play()
-            self.game.ship.meteors_destroyed += 1
+        self.velocity = pygame.Vector2(0, -self.speed)
+        self.reset(image, ship_pos)
 
-class Explosion(pygame.sprite.Sprite):
-    def __init__(self, game, image, groups, pos):
-        super().__init__(groups)
-        self.game = game
-        self.frames = image
-        self.image = self.frames[0]
-        self.rect = self.image.get_frect(center=pos)
-        self.frames_speed = 50
-        self.frame_index = 0
+    def reset(self, image, ship_pos):
+        self.image = image
+        self.mask = self.game.assets.masks[self.image]
+        self.rect.size = self.image.get_size()
+        self.rect.midbottom = (ship_pos[0], ship_pos[1])
+        self.creation_time = self.game.screen.game_clock.get_ticks()
     
     def update(self, delta_time):
-        self.frame_index += self.frames_speed * delta_time
-        self.image = self.frames[int(self.frame_index) % len(self.frames)]
-        if len(self.frames) == int(self.frame_index) % len(self.frames) + 1: 
-            self.kill()
+        self.rect.y += self.velocity.y * delta_time
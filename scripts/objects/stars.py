@@ -1,13 +1,75 @@
 import pygame
-from random import randint
-
-class Stars(pygame.sprite.Sprite):
-    def __init__(self, game, image, groups):
-        super().__init__(groups)
-        self.game = game
-        self.image = image
-        self.rect = self.image.get_frect(center = (randint(0, self.game.screen.WIDTH), randint(0, self.game.screen.HEIGHT)))
-    
+import random
+
+class Starfield():
+    '''
+    Pre-baked star background, with optional parallax layers that scroll as whole surfaces.
+    '''
+    def __init__(self, image, size, color, count=20, layers=1, scroll_speed=0):
+        '''
+        Initializes the Starfield class, compositing every star once.
+
+        Parameters:
+        - image: The star surface;
+        - size: Size (width, height) of the area covered by the stars;
+        - color: Background fill color;
+        - count: Total number of stars, split evenly between the layers;
+        - layers: Number of depth layers, the first one being the farthest;
+        - scroll_speed: Downward speed of the nearest layer in pixels per second (0 keeps every layer static).
+
+        Attributes:
+        - background: The fill color with every static star baked in;
+        - layers: List of [surface, speed, offset] for each scrolling layer;
+        - scrolling: Whether any layer moves, meaning the background changes every frame.
+        '''
+        self.size = size
+        self.background = pygame.Surface(size)
+        self.background.fill(color)
+        self.layers = []
+        for layer in range(layers):
+            # Farther layers use smaller stars and scroll slower.
+            star = pygame.transform.smoothscale_by(image, max((layer + 1) / layers, 0.3))
+            speed = scroll_speed * (layer + 1) / layers
+            stars = count // layers + (1 if layer < count % layers else 0)
+            if speed:
+                surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+                self.bake(surface, star, stars)
+                self.layers.append([surface, speed, 0])
+            else:
+                self.bake(self.background, star, stars)
+        self.scrolling = bool(self.layers)
+
+    def bake(self, surface, star, count):
+        '''
+        Blits stars at random positions onto a surface in a single call.
+
+        Parameters:
+        - surface: The surface receiving the stars;
+        - star: The star surface;
+        - count: Number of stars.
+        '''
+        half_width = star.get_width() / 2
+        half_height = star.get_height() / 2
+        surface.fblits([(star, (random.randint(0, self.size[0]) - half_width, random.randint(0, self.size[1]) - half_height)) for _ in range(count)])
+
     def update(self, delta_time):
-        pass
-    
\ No newline at end of file
+        '''
+        Scrolls the parallax layers.
+
+        Parameters:
+        - delta_time: Time elapsed since the last update, in seconds.
+        '''
+        for layer in self.layers:
+            layer[2] = (layer[2] + layer[1] * delta_time) % self.size[1]
+
+    def draw(self, surface):
+        '''
+        Draws the background and the scrolling layers, wrapping each layer vertically.
+
+        Parameters:
+        - surface: The surface to draw on.
+        '''
+        surface.blit(self.background, (0, 0))
+        for layer_surf, _, offset in self.layers:
+            surface.blit(layer_surf, (0, offset))
+            surface.blit(layer_surf, (0, offset - self.size[1]))